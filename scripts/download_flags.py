@@ -2,28 +2,37 @@
 """Download country flags for teams listed in data/qualified.csv
 
 Saves PNGs to `data/flags/` named by ISO2 code (lowercase), e.g. `us.png`.
+Extra widths (`--extra-sizes`) go to `data/flags/w<size>/`.
+
+Flags are fetched concurrently over one pooled session with retries and
+backoff.  The ETag / Last-Modified of every download is kept in
+`data/.flag_cache.json` (`--cache`, outside the flags directory so the
+app's flag manifest never sees it) and sent back as a conditional
+request, so a refresh only transfers the flags that changed upstream.
 
 Usage:
     python scripts/download_flags.py --source data/qualified.csv --out data/flags --size 80
+    python scripts/download_flags.py --extra-sizes 40 160 --base-url http://localhost:8000
 """
 import os
+import sys
 import csv
+import json
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import pycountry
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 
+# shared with the app's flag manifest
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(__file__), '..')))
+from wc26.flags import name_to_alpha2  # noqa: E402
 
-OVERRIDES = {
-    'United States': 'US',
-    'South Korea': 'KR',
-    'North Korea': 'KP',
-    'Côte d\'Ivoire': 'CI',
-    'Ivory Coast': 'CI',
-    'DR Congo': 'CD',
-    'Republic of Ireland': 'IE',
-    'USA': 'US',
-}
+BASE_URL = os.environ.get('WC26_FLAG_URL', 'https://flagcdn.com')
+CACHE_FILE = 'data/.flag_cache.json'
 
 
 def normalize_name(name: str) -> str:
@@ -34,42 +43,49 @@ def normalize_name(name: str) -> str:
     return n
 
 
-def name_to_alpha2(name: str):
-    # check overrides first
-    if name in OVERRIDES:
-        return OVERRIDES[name].lower()
-    try:
-        c = pycountry.countries.lookup(name)
-        return c.alpha_2.lower()
-    except Exception:
-        # try fuzzy search
-        try:
-            res = pycountry.countries.search_fuzzy(name)
-            if res:
-                return res[0].alpha_2.lower()
-        except Exception:
-            return None
-
-
-def download_flag(alpha2: str, out_dir: str, size: int = 80) -> bool:
-    url = f'https://flagcdn.com/w{size}/{alpha2}.png'
-    out_path = os.path.join(out_dir, f'{alpha2}.png')
-    if os.path.exists(out_path):
-        print(f'Skipping existing {out_path}')
-        return True
+def make_session(workers: int, retries: int = 3) -> requests.Session:
+    """Session with a connection pool per worker and retry with exponential backoff."""
+    retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def flag_url(base_url: str, alpha2: str, size: int) -> str:
+    return f'{base_url.rstrip("/")}/w{size}/{alpha2}.png'
+
+
+def download_flag(session, url: str, out_path: str, meta=None):
+    """Fetch `url` into `out_path`, conditionally on the cached `meta`.
+
+    Returns ``(status, meta)`` with status 'downloaded', 'unchanged' or an
+    error message, and the validators to cache for next time.
+    """
+    headers = {}
+    if meta and os.path.exists(out_path):
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
     try:
-        resp = requests.get(url, timeout=15)
-        if resp.status_code == 200:
-            with open(out_path, 'wb') as f:
-                f.write(resp.content)
-            print(f'Downloaded {out_path}')
-            return True
-        else:
-            print(f'Failed to download {alpha2}: HTTP {resp.status_code}')
-            return False
-    except Exception as e:
-        print(f'Error downloading {alpha2}: {e}')
-        return False
+        resp = session.get(url, headers=headers, timeout=15)
+    except requests.RequestException as e:
+        return f'error: {e}', meta
+    if resp.status_code == 304:
+        return 'unchanged', meta
+    if resp.status_code != 200:
+        return f'HTTP {resp.status_code}', meta
+    # write to a temporary file first so an interrupted run never leaves half a flag;
+    # the name does not end in .png, so the flag manifest skips it
+    tmp = out_path + '.part'
+    with open(tmp, 'wb') as f:
+        f.write(resp.content)
+    os.replace(tmp, out_path)
+    return 'downloaded', {'etag': resp.headers.get('ETag'),
+                          'last_modified': resp.headers.get('Last-Modified')}
 
 
 def read_qualified(source_path: str):
@@ -90,16 +106,38 @@ def read_qualified(source_path: str):
     return teams
 
 
+def load_cache(path: str):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path: str, cache):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument('--source', default='data/qualified.csv')
     p.add_argument('--out', default='data/flags')
-    p.add_argument('--size', type=int, default=80)
+    p.add_argument('--size', type=int, default=80, help='width saved as <out>/<code>.png')
+    p.add_argument('--extra-sizes', type=int, nargs='*', default=[],
+                   help='further widths (e.g. 40 160), saved as <out>/w<size>/<code>.png')
+    p.add_argument('--base-url', default=BASE_URL,
+                   help='flag server; fetches <base-url>/w<size>/<code>.png (env WC26_FLAG_URL)')
+    p.add_argument('--cache', default=CACHE_FILE, help='ETag / Last-Modified cache file')
+    p.add_argument('--workers', type=int, default=8, help='concurrent downloads')
+    p.add_argument('--retries', type=int, default=3)
     args = p.parse_args()
 
     os.makedirs(args.out, exist_ok=True)
     teams = read_qualified(args.source)
 
+    codes = []
     for t in teams:
         name = normalize_name(t)
         # skip placeholders
@@ -110,9 +148,33 @@ def main():
         if not alpha2:
             print(f'No ISO mapping for "{name}" — skipped')
             continue
-        ok = download_flag(alpha2, args.out, size=args.size)
-        # be polite
-        time.sleep(0.15)
+        codes.append(alpha2)
+
+    jobs = []
+    for size in [args.size] + [s for s in args.extra_sizes if s != args.size]:
+        out_dir = args.out if size == args.size else os.path.join(args.out, f'w{size}')
+        os.makedirs(out_dir, exist_ok=True)
+        for alpha2 in sorted(set(codes)):
+            jobs.append((flag_url(args.base_url, alpha2, size), os.path.join(out_dir, f'{alpha2}.png')))
+
+    cache = load_cache(args.cache)
+    start = time.perf_counter()
+    with make_session(args.workers, args.retries) as session, \
+            ThreadPoolExecutor(args.workers) as pool:
+        results = pool.map(lambda job: download_flag(session, *job, cache.get(job[0])), jobs)
+        tally = {}
+        for (url, out_path), (status, meta) in zip(jobs, results):
+            if status in ('downloaded', 'unchanged'):
+                cache[url] = meta
+                tally[status] = tally.get(status, 0) + 1
+                if status == 'downloaded':
+                    print(f'Downloaded {out_path}')
+            else:
+                tally['failed'] = tally.get('failed', 0) + 1
+                print(f'Failed to download {url}: {status}')
+    save_cache(args.cache, cache)
+    summary = ', '.join(f'{n} {status}' for status, n in sorted(tally.items()))
+    print(f'{len(jobs)} flags in {time.perf_counter() - start:.1f}s: {summary}')
 
 
 if __name__ == '__main__':
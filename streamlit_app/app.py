@@ -1,12 +1,22 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import html
 import random
 import time
-try:
-    import pycountry
-except Exception:
-    pycountry = None
 import os
+import sys
+
+# make the headless engine package at the repository root importable
+ROOT_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from wc26 import data, flags, instrument, jobs, tournament
+from wc26.data import make_pots
+from wc26.draw import DrawEngine
+from wc26.restart import RestartDraw
+from wc26.sequential import SequentialDraw
 
 st.set_page_config(page_title="2026 World Cup Draw Simulator", layout="wide")
 
@@ -18,172 +28,49 @@ Simple draw simulator. Click **Simulate Draw** to randomly fill groups according
 """
 )
 
-DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data'))
-RANKINGS_CSV = os.path.join(DATA_DIR, 'rankings.csv')
-QUALIFIED_CSV = os.path.join(DATA_DIR, 'qualified.csv')
-
-def load_qualified():
-    if os.path.exists(QUALIFIED_CSV):
-        dfq = pd.read_csv(QUALIFIED_CSV)
-        teams = [t for t in dfq['team'].tolist()]
-        conf_map = {}
-        if 'confederation' in dfq.columns:
-            for t, c in zip(dfq['team'].tolist(), dfq['confederation'].tolist()):
-                conf_map[t] = c
-        return teams, conf_map
-    return [], {}
-
-def load_rankings():
-    if os.path.exists(RANKINGS_CSV):
-        dfr = pd.read_csv(RANKINGS_CSV)
-        return dfr
-    return pd.DataFrame(columns=['team','rank'])
-
-qualified, qualified_conf = load_qualified()
-dfr = load_rankings()
-
 groups = [chr(ord('A') + i) for i in range(12)]  # A..L (12 groups)
 
-def make_pots(qualified, dfr):
-    # produce list of qualified teams ordered by ranking
-    ranked = [r for r in dfr['team'].tolist()]
-    # teams present in both rankings and qualified, preserving ranking order
-    rank_order = [r for r in ranked if r in qualified]
-    # append any qualified teams missing from rankings at the end (to avoid losing them)
-    missing_from_rankings = [q for q in qualified if q not in rank_order]
-    if missing_from_rankings:
-        rank_order.extend(missing_from_rankings)
-    # Ensure Mexico/Canada/United States present as A1/B1/D1
-    pot1 = []
-    for special in ['Mexico', 'Canada', 'United States']:
-        if special in qualified:
-            pot1.append(special)
-
-    # add top-ranked qualified teams excluding specials until we have 12
-    for t in rank_order:
-        if t in pot1:
-            continue
-        if len(pot1) >= 12:
-            break
-        pot1.append(t)
-
-    # Next pots: sequential in ranking order skipping pot1 teams
-    remaining = [t for t in rank_order if t not in pot1]
-    pot2 = remaining[:12]
-    pot3 = remaining[12:24]
-    pot4_real = remaining[24:]
-    # Fill pot4 with placeholders to reach 12
-    pot4 = pot4_real.copy()
-    # placeholders: 4 UEFA PO winners, 2 intercontinental
-    placeholders = [f'UEFA Path {i+1}' for i in range(4)] + [f'IC Winner {i+1}' for i in range(2)]
-    for ph in placeholders:
-        if len(pot4) >= 12:
-            break
-        pot4.append(ph)
-    # if still less than 12, pad with generic placeholders
-    while len(pot4) < 12:
-        pot4.append(f'Pot4 Placeholder {len(pot4)+1}')
-
-    return pot1, pot2, pot3, pot4
-
-pot1, pot2, pot3, pot4 = make_pots(qualified, dfr)
-
-def team_confederation(team):
-    # return confederation code or None; mark intercontinental as special 'INTER'
-    if team in qualified_conf:
-        return qualified_conf[team]
-    if isinstance(team, str):
-        if team.startswith('UEFA') or 'UEFA' in team:
-            return 'UEFA'
-        if team.startswith('IC') or 'Intercontinental' in team:
-            return 'INTER'
-    return None
-
-def conf_limit(conf):
-    if conf == 'UEFA':
-        return 2
-    # default: one per confederation
-    return 1
-
-def can_place_team_in_group(team, grp, result):
-    """Return True if `team` may be placed into group `grp` considering current `result`."""
-    conf = team_confederation(team)
-    if conf == 'INTER':
-        return True
-    # count existing teams of same conf in group
-    count = 0
-    for t in result.get(grp, []):
-        if not t:
-            continue
-        tc = team_confederation(t)
-        if tc == conf:
-            count += 1
-    limit = conf_limit(conf)
-    return count < limit
-
-def assign_pot_with_rules(result, pot, slot_index, max_attempts=500):
-    """Attempt to place all teams from `pot` into `result` at `slot_index` respecting confed rules.
-    Uses greedy singleton propagation and random choices; retries if conflict arises.
-    Returns True on success (mutates result), False otherwise.
-    """
-    groups_list = list(groups)
-
-    for attempt in range(max_attempts):
-        # working copy of result for this attempt
-        working = {g: list(result[g]) for g in groups_list}
-        pool = pot.copy()
-        random.shuffle(pool)
-        success = True
-
-        # iterative placement loop with singleton propagation
-        while pool:
-            progressed = False
-            # compute possible groups for each team
-            poss = {}
-            for team in pool:
-                allowed = []
-                for g in groups_list:
-                    # must have empty slot at slot_index
-                    if working[g][slot_index] is not None:
-                        continue
-                    if can_place_team_in_group(team, g, working):
-                        allowed.append(g)
-                poss[team] = allowed
-
-            # if any team has zero possibilities, fail this attempt
-            dead = [t for t, opts in poss.items() if len(opts) == 0]
-            if dead:
-                success = False
-                break
-
-            # forced placements (singleton)
-            forced = [t for t, opts in poss.items() if len(opts) == 1]
-            if forced:
-                for t in forced:
-                    g = poss[t][0]
-                    working[g][slot_index] = t
-                    pool.remove(t)
-                    progressed = True
-                continue
-
-            # otherwise pick a random team and random allowed group
-            t = random.choice(pool)
-            opts = poss[t]
-            g = random.choice(opts)
-            working[g][slot_index] = t
-            pool.remove(t)
-            progressed = True
-
-            if not progressed:
-                success = False
-                break
-
-        if success:
-            # commit working into result
-            for g in groups_list:
-                result[g] = working[g]
-            return True
-    return False
+INPUT_FILES = (data.QUALIFIED_CSV, data.RANKINGS_CSV, data.SCHEDULE_CSV)
+
+
+@st.cache_data(show_spinner=False)
+def load_inputs(signature):
+    """Teams, confederations and pots; `signature` (file mtimes/sizes) keys the cache."""
+    qualified, conf_map = data.load_qualified()
+    ranked = data.load_rankings()
+    ranked_names = set(ranked)
+    return {
+        'qualified': qualified,
+        'conf_map': conf_map,
+        'pots': make_pots(qualified, ranked),
+        'missing': [q for q in qualified if q not in ranked_names],
+        'digest': data.content_digest(*INPUT_FILES),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def compile_engines(digest, _pots, _conf_map):
+    """Compiled draw/tournament engines shared by all sessions, keyed by the input contents."""
+    pots = [list(p) for p in _pots]
+    engine = DrawEngine(pots, _conf_map)
+    return {
+        'restart': RestartDraw(pots, _conf_map),
+        'sequential': SequentialDraw(pots, _conf_map),
+        'engine': engine,
+        'tournament': tournament.Tournament(engine, outputs=('champion', 'reach')),
+    }
+
+
+inputs = load_inputs(data.file_signature(*INPUT_FILES))
+qualified, qualified_conf = inputs['qualified'], inputs['conf_map']
+pot1, pot2, pot3, pot4 = inputs['pots']
+engines = compile_engines(inputs['digest'], inputs['pots'], qualified_conf)
+
+# a draw made from other input files no longer matches the pots
+if st.session_state.get('data_digest') != inputs['digest']:
+    st.session_state.data_digest = inputs['digest']
+    for key in ('draw_result', 'draw_done', 'tournament_job'):
+        st.session_state.pop(key, None)
 
 # Show pots in an expander (dropdown) instead of sidebar
 with st.expander('Show Pots'):
@@ -201,8 +88,7 @@ with st.expander('Show Pots'):
                     # protect against UI rendering issues for unexpected values
                     st.write(str(t))
     # surface any qualified teams missing from the rankings
-    ranked_names = set(dfr['team'].tolist())
-    missing = [q for q in qualified if q not in ranked_names]
+    missing = inputs['missing']
     if missing:
         st.warning('The following qualified teams were not found in the rankings file and were appended to the pots:')
         for m in missing:
@@ -213,114 +99,96 @@ if 'draw_result' not in st.session_state:
     st.session_state.draw_result = {g: [None, None, None, None] for g in groups}
     st.session_state.draw_done = False
 
+GRID_CSS = """
+<style>
+.wc-grid {display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem 2rem; margin-bottom: 1rem;}
+.wc-grid h4 {margin: 0 0 .4rem 0; padding: 0; font-size: 1rem;}
+.wc-team {display: flex; align-items: center; gap: .6rem; height: 2.4rem;}
+.wc-team img, .wc-team .wc-noflag {width: 48px; height: 32px; object-fit: contain; flex: none;}
+</style>
+"""
+
+
 def render_group_grid(result):
-    """Render the groups as a 4x3 grid showing the 4 teams per group.
-    This avoids storing Streamlit DeltaGenerator objects in session state.
+    """Render the groups as one HTML payload: a 4x3 grid with 4 teams per group
+    and the flags inlined as data URIs, instead of a widget per team and flag.
     """
-    idx = 0
-    for row in range(4):
-        cols = st.columns(3)
-        for c in range(3):
-            if idx >= len(groups):
-                break
-            grp = groups[idx]
-            with cols[c]:
-                st.markdown(f"**Group {grp}**")
-                teams = result.get(grp, [None, None, None, None])
-                for i, t in enumerate(teams, start=1):
-                    # show flag (if available) then team name
-                    row_cols = st.columns([1, 8])
-                    fpath = flag_for(t) if t else None
-                    if fpath:
-                        try:
-                            row_cols[0].image(fpath, width=48)
-                        except Exception:
-                            row_cols[0].write('')
-                    else:
-                        row_cols[0].write('')
-                    row_cols[1].write(t if t else '—')
-            idx += 1
-
-flags_dir = os.path.join(DATA_DIR, 'flags')
-
-def flag_for(team):
-    # look for flag image by several strategies:
-    # 1) normalized team name file (e.g. united_states.png)
-    # 2) ISO2 code file using pycountry lookup (e.g. us.png)
-    if not os.path.isdir(flags_dir) or not isinstance(team, str):
-        return None
-    name = team.lower().replace(' ', '_').replace("'", '').replace('.', '')
-    for ext in ('.png', '.jpg', '.svg'):
-        p = os.path.join(flags_dir, name + ext)
-        if os.path.exists(p):
-            return p
-
-    # try pycountry to map to alpha2
-    if pycountry:
-        try:
-            c = pycountry.countries.lookup(team)
-            alpha2 = c.alpha_2.lower()
-            for ext in ('.png', '.jpg', '.svg'):
-                p = os.path.join(flags_dir, alpha2 + ext)
-                if os.path.exists(p):
-                    return p
-        except Exception:
-            try:
-                res = pycountry.countries.search_fuzzy(team)
-                if res:
-                    alpha2 = res[0].alpha_2.lower()
-                    for ext in ('.png', '.jpg', '.svg'):
-                        p = os.path.join(flags_dir, alpha2 + ext)
-                        if os.path.exists(p):
-                            return p
-            except Exception:
-                pass
-
-    # fallback: no flag found
-    return None
+    cells = []
+    for grp in groups:
+        rows = [f'<h4>Group {grp}</h4>']
+        for t in result.get(grp, [None, None, None, None]):
+            uri = flag_uris.get(t) if t else None
+            flag = f'<img src="{uri}" alt="">' if uri else '<span class="wc-noflag"></span>'
+            rows.append(f'<div class="wc-team">{flag}<span>{html.escape(t) if t else "—"}</span></div>')
+        cells.append('<div>' + ''.join(rows) + '</div>')
+    st.markdown(GRID_CSS + '<div class="wc-grid">' + ''.join(cells) + '</div>', unsafe_allow_html=True)
+
+@st.cache_data(show_spinner=False)
+def load_flag_uris(signature):
+    """Team -> inlined flag image, rebuilt only when the flags directory or qualified.csv changes."""
+    return flags.data_uris(flags.load_manifest())
+
+
+flag_uris = load_flag_uris(data.file_signature(flags.FLAGS_DIR, data.QUALIFIED_CSV))
+
+@st.cache_resource(show_spinner=False)
+def job_manager():
+    """Background simulation jobs; one worker pool shared by every session."""
+    return jobs.JobManager()
+
+
+def cancel_tournament_job():
+    job_id = st.session_state.pop('tournament_job', None)
+    if job_id is not None:
+        job_manager().cancel(job_id)
+
+
+def show_tournament_job(job_id):
+    job = job_manager().get(job_id)
+    if job is None:
+        return
+    st.write('## Tournament odds')
+    if job.active:
+        st.progress(job.progress, text=f'{job.done:,} / {job.total:,} tournaments')
+        if st.button('Cancel simulation'):
+            job.cancel()
+    elif job.status == jobs.FAILED:
+        st.error(f'Simulation failed: {job.error}')
+    tally = job.partial()
+    if tally is not None:
+        note = {jobs.CANCELLED: ' (cancelled)'}.get(job.status, '')
+        st.caption(f'{tally.n:,} tournaments from this draw in {job.seconds:.1f}s '
+                   f'({tally.n / max(job.seconds, 1e-9):,.0f} tournaments/s){note}')
+        reach = pd.DataFrame(tally.probabilities('reach'), index=engines['engine'].teams,
+                             columns=tally.columns)
+        st.dataframe(reach.sort_values('Champion', ascending=False).style.format('{:.1%}'))
+    if not job.active and st.session_state.get('polling_job') == job_id:
+        del st.session_state['polling_job']
+        st.rerun()
 
 st.write('## Groups')
 
+DRAW_MODES = ['Randomized restarts', 'Sequential (feasibility-checked)']
+draw_mode = st.radio('Draw algorithm', DRAW_MODES, horizontal=True,
+                     help='Sequential checks before every ball that the rest of the draw can still '
+                          'be completed, so it never restarts or fails.')
+
 col1, col2 = st.columns([1,1])
 
 with col1:
     if st.button('Simulate Draw'):
         try:
-            attempts = 300
-            final_result = None
-            for attempt in range(attempts):
-                # start fresh
-                result = {g: [None, None, None, None] for g in groups}
-
-                # pot1: place fixed teams then place remaining with rules
-                p1 = pot1.copy()
-                random.shuffle(p1)
-                fixed_map = {'Mexico': 'A', 'Canada': 'B', 'United States': 'D'}
-                for team, grp in fixed_map.items():
-                    if team in p1 and grp in groups:
-                        result[grp][0] = team
-                        p1.remove(team)
-
-                ok = assign_pot_with_rules(result, p1, 0)
-                if not ok:
-                    continue
-
-                # pots 2..4 with confed rules (intercontinental placeholders are exempt)
-                if not assign_pot_with_rules(result, pot2, 1):
-                    continue
-                if not assign_pot_with_rules(result, pot3, 2):
-                    continue
-                if not assign_pot_with_rules(result, pot4, 3):
-                    continue
-
-                final_result = result
-                break
+            if draw_mode == DRAW_MODES[1]:
+                final_result = engines['sequential'].draw()
+            else:
+                final_result = engines['restart'].draw()
 
             if final_result is None:
                 st.error('Unable to produce a valid draw respecting confederation rules after several attempts.')
             else:
                 st.session_state.draw_result = final_result
                 st.session_state.draw_done = True
+                cancel_tournament_job()
         except Exception:
             import traceback
             tb = traceback.format_exc()
@@ -329,8 +197,15 @@ with col1:
 
 with col2:
     if st.session_state.draw_done:
+        n_tournaments = st.number_input('Tournaments to simulate', min_value=1000, max_value=10_000_000,
+                                        value=100_000, step=10_000)
         if st.button('Continue to tournament'):
-            st.info('Continue pressed — placeholder')
+            engine = engines['engine']
+            sim = engines['tournament'].with_draw(engine.from_groups(st.session_state.draw_result))
+            cancel_tournament_job()
+            st.session_state.tournament_job = job_manager().submit(
+                sim, int(n_tournaments), seed=random.randrange(2**32), task=tournament.tally_tournaments,
+                shard_size=engine.batch_size)
     else:
         st.write('Run the draw to enable the continue button')
 
@@ -341,3 +216,44 @@ with col2:
 
 # render group grid after any draw action so it reflects the latest `st.session_state.draw_result`
 render_group_grid(st.session_state.draw_result)
+
+job_id = st.session_state.get('tournament_job')
+if job_id is not None:
+    job = job_manager().get(job_id)
+    if job is not None and job.active:
+        st.session_state.polling_job = job_id
+    # poll only while the job runs; the last poll triggers one full rerun to stop it
+    st.fragment(run_every=1.0 if job is not None and job.active else None)(show_tournament_job)(job_id)
+
+
+def show_diagnostics():
+    with st.expander('Diagnostics'):
+        st.write('Counts draw restarts, pot attempts and dead ends, and times each pot and '
+                 'tournament stage, for one profiling run started here.')
+        c1, c2 = st.columns([1, 1])
+        if c1.button('Profile 100 draws', help='Run 100 randomized-restart draws with counters on.'):
+            with instrument.collect() as stats:
+                for _ in range(100):
+                    engines['restart'].draw()
+            st.session_state.diagnostics = stats.snapshot()
+        if c2.button('Profile tournament stages',
+                     help='Simulate one batch in this process to time draw, groups and knockouts.'):
+            sim = engines['tournament']
+            if st.session_state.draw_done:
+                sim = sim.with_draw(engines['engine'].from_groups(st.session_state.draw_result))
+            with instrument.collect() as stats:
+                tournament.tally_tournaments(sim, sim.batch_size, np.random.default_rng())
+            st.session_state.diagnostics = stats.snapshot()
+        stats = st.session_state.get('diagnostics')
+        if stats is None:
+            st.write('Nothing collected yet.')
+            return
+        if stats['counts']:
+            st.dataframe(pd.DataFrame({'count': stats['counts']}))
+        if stats['timers']:
+            timers = pd.DataFrame(stats['timers'], index=['calls', 'seconds']).T
+            timers['mean ms'] = timers['seconds'] / timers['calls'] * 1e3
+            st.dataframe(timers.style.format({'calls': '{:.0f}', 'seconds': '{:.3f}',
+                                              'mean ms': '{:.3f}'}))
+
+show_diagnostics()
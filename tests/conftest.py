@@ -0,0 +1,18 @@
+import pytest
+
+import wc26
+
+
+@pytest.fixture(scope='session')
+def pots():
+    return wc26.load_pots()
+
+
+@pytest.fixture(scope='session')
+def engine(pots):
+    return wc26.DrawEngine(*pots)
+
+
+@pytest.fixture(scope='session')
+def tournament(engine):
+    return wc26.Tournament(engine)
@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+
+import wc26
+from wc26.data import FIXED_GROUPS, GROUPS
+
+N_ENGINE = 200_000
+N_RESTART = 60_000
+# largest |z| expected over the 576 team x group cells at these sizes is
+# about 3.7; well above it means the two draws disagree
+MAX_Z = 4.5
+
+
+def check_rules(engine, draws):
+    n = len(draws)
+    teams = draws.astype(np.intp)
+    # every team once, from its own pot
+    assert (np.sort(teams.reshape(n, -1), axis=1) == np.arange(len(engine.teams))).all()
+    assert (teams // len(GROUPS) == np.arange(4)).all()
+    for team, group in FIXED_GROUPS.items():
+        assert (teams[:, GROUPS.index(group), 0] == engine.team_index[team]).all()
+    # confederation limits per group
+    counts = np.zeros((n, len(GROUPS), len(engine.confederations)), dtype=np.intp)
+    np.add.at(counts, (np.arange(n)[:, None, None], np.arange(len(GROUPS))[None, :, None],
+                       engine.team_conf[teams]), 1)
+    limit = np.where(engine.conf_exempt, 4, engine.conf_limit)
+    assert (counts <= limit).all()
+
+
+def test_engine_draws_follow_the_rules(engine):
+    check_rules(engine, engine.draw(20_000, np.random.default_rng(1)))
+
+
+def test_restart_draws_follow_the_rules(pots, engine):
+    restart = wc26.RestartDraw(*pots)
+    rng = random.Random(1)
+    draws = np.array([engine.from_groups(restart.draw(rng)) for _ in range(500)])
+    check_rules(engine, draws)
+
+
+def group_frequencies(engine, draws):
+    n = len(draws)
+    groups = np.broadcast_to(np.arange(len(GROUPS))[:, None], draws.shape[1:])
+    cells = draws.astype(np.intp).reshape(n, -1) * len(GROUPS) + groups.reshape(-1)
+    return np.bincount(cells.reshape(-1), minlength=len(engine.teams) * len(GROUPS)) / n
+
+
+def test_engine_matches_restart_draw(pots, engine):
+    restart = wc26.RestartDraw(*pots)
+    rng = random.Random(7)
+    reference = np.array([engine.from_groups(restart.draw(rng)) for _ in range(N_RESTART)])
+    p_ref = group_frequencies(engine, reference)
+    p_eng = group_frequencies(engine, engine.draw(N_ENGINE, np.random.default_rng(7)))
+    var = p_ref * (1 - p_ref) / N_RESTART + p_eng * (1 - p_eng) / N_ENGINE
+    live = var > 0
+    # cells that are certain (hosts) or impossible must be so in both
+    assert np.array_equal(p_ref[~live], p_eng[~live])
+    z = np.abs(p_eng - p_ref)[live] / np.sqrt(var[live])
+    assert live.sum() > 500
+    assert z.max() < MAX_Z
@@ -0,0 +1,38 @@
+import numpy as np
+
+import wc26
+from wc26.data import GROUPS
+from wc26.exact import solve
+
+N_DRAWS = 200_000
+# largest |z| expected over the ~1300 compared cells is about 3.5-4
+MAX_Z = 4.5
+
+
+def z_scores(exact, sampled, n):
+    var = exact * (1 - exact) / n
+    live = var > 0
+    # certain or impossible cells must be so in the samples too
+    assert np.array_equal(sampled[~live], exact[~live])
+    return np.abs(sampled - exact)[live] / np.sqrt(var[live])
+
+
+def test_pair_probabilities_are_consistent(engine):
+    exact = solve(engine)
+    pots = np.arange(len(engine.teams)) // len(GROUPS)
+    same_pot = pots[:, None] == pots[None, :]
+    assert (exact.pair[same_pot] == 0).all()
+    assert np.allclose(exact.pair, exact.pair.T)
+    # every team shares its group with one team of each other pot
+    assert np.allclose(exact.pair.sum(axis=1), 3)
+    assert np.allclose(exact.team_group.sum(axis=1), 1)
+    assert np.allclose(exact.team_group.sum(axis=0), 4)
+
+
+def test_exact_matches_sampled_draws(engine):
+    exact = solve(engine)
+    agg = wc26.DrawAggregator.for_engine(engine)
+    agg.add_draws(engine.draw(N_DRAWS, np.random.default_rng(11)))
+    assert z_scores(exact.team_group, agg.group_probabilities(), N_DRAWS).max() < MAX_Z
+    upper = np.triu_indices(len(engine.teams), 1)
+    assert z_scores(exact.pair[upper], agg.meet_probabilities()[upper], N_DRAWS).max() < MAX_Z
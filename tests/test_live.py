@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from wc26.live import LiveTournament
+
+
+def played_group_stage(tournament, seed=3):
+    engine = tournament.engine
+    draw = engine.to_groups(engine.draw(1, np.random.default_rng(seed))[0])
+    live = LiveTournament(tournament, draw, n=2000, seed=seed)
+    goals = np.random.default_rng(seed).poisson(1.3, (len(live.stage.matches), 2))
+    for m, (home, away) in zip(live.stage.matches, goals):
+        live.ingest(int(m), int(home), int(away))
+    live.refresh()
+    return live
+
+
+def test_group_results_settle_the_groups(tournament):
+    live = played_group_stage(tournament)
+    finish = live.finish_probabilities()
+    assert ((finish == 0) | (finish == 1)).all()
+
+
+def test_refresh_with_group_and_knockout_results(tournament):
+    live = played_group_stage(tournament)
+    bracket = live.bracket
+    first = bracket.stage == bracket.stage[0]
+    settled = [i for i in np.nonzero(first)[0]
+               if all((live.table[:, c] == live.table[0, c]).all() for c in bracket.source[i])]
+    i = settled[0]
+    home, away = (int(live.table[0, c]) for c in bracket.source[i])
+    # a knockout result and a (repeated) group result in the same refresh
+    live.ingest(int(bracket.matches[i]), 2, 0)
+    k = 0
+    live.ingest(int(live.stage.matches[k]), int(live.home_goals[0, k]), int(live.away_goals[0, k]))
+    live.refresh()
+    assert (live.table[:, bracket.knockout_base + 2 * i] == home).all()
+    assert (live.table[:, bracket.knockout_base + 2 * i + 1] == away).all()
+    # the winner goes on to its next match in every sample
+    nxt = next(j for j in range(len(bracket.matches))
+               if bracket.knockout_base + 2 * i in bracket.source[j])
+    assert (live.table[:, bracket.source[nxt]] == home).any(axis=1).all()
+    reach = live.reach_probabilities()
+    assert reach[away, bracket.stage[nxt]:].sum() == 0
+
+
+def test_knockout_result_needs_settled_teams(tournament):
+    engine = tournament.engine
+    draw = engine.to_groups(engine.draw(1, np.random.default_rng(0))[0])
+    live = LiveTournament(tournament, draw, n=500, seed=0)
+    with pytest.raises(ValueError, match='not settled'):
+        live.ingest(int(live.bracket.matches[0]), 1, 0)
+
+
+def test_ingest_csv_applies_new_and_changed_rows(tournament, tmp_path):
+    live = played_group_stage(tournament)
+    path = tmp_path / 'results.csv'
+    rows = [(int(m), int(live.home_goals[0, k]), int(live.away_goals[0, k]))
+            for k, m in enumerate(live.stage.matches)]
+    path.write_text('match,home_goals,away_goals,winner\n'
+                    + ''.join(f'{m},{h},{a},\n' for m, h, a in rows), encoding='utf-8')
+    # everything was ingested by hand already
+    assert live.ingest_csv(str(path)) == []
+    m, h, a = rows[0]
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f'{m},{h + 1},{a},\n')
+    assert live.ingest_csv(str(path)) == [m]
+    assert (live.home_goals[:, 0] == h + 1).all()
+    assert live.remaining == sorted(int(x) for x in live.bracket.matches)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from wc26.rankings import RankingHistory, parse_text
+
+
+def test_parse_text_takes_the_points_after_the_name():
+    dump = ['2025-11-19', '1', 'Spain', '1880.76', '1877.18',
+            '2', '2', 'Argentina', '1872.43', '1873.33',
+            '-1', '3', 'France', '1862.03']
+    [(date, entries)] = parse_text(dump)
+    assert date == '2025-11-19'
+    assert entries == [('Spain', 1, 1880.76), ('Argentina', 2, 1872.43), ('France', 3, 1862.03)]
+
+
+def test_parse_text_splits_releases():
+    dump = ['1', 'Spain', '2', 'France', '2024-12-19', '1', 'France', '2', 'Spain']
+    releases = list(parse_text(dump, date='2024-11-28'))
+    assert [d for d, _ in releases] == ['2024-11-28', '2024-12-19']
+    assert [t for t, _, _ in releases[1][1]] == ['France', 'Spain']
+    assert np.isnan(releases[0][1][0][2])
+
+
+def test_snapshot_is_the_release_in_force():
+    releases = [('2024-11-28', [('Spain', 1, 1.0), ('France', 2, 2.0)]),
+                ('2024-12-19', [('France', 1, 3.0), ('Spain', 2, 4.0)])]
+    history = RankingHistory.build(releases)
+    assert history.ranks('2024-12-01') == {'Spain': 1, 'France': 2}
+    assert history.ranked('2025-06-01') == ['France', 'Spain']
+    assert history.points_on('2024-12-19') == {'France': 3.0, 'Spain': 4.0}
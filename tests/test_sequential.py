@@ -0,0 +1,25 @@
+import random
+
+import numpy as np
+
+from wc26.exact import solve
+from wc26.sequential import SequentialDraw
+
+from .test_draw import check_rules, group_frequencies
+
+
+def test_sequential_draws_follow_the_rules(pots, engine):
+    sequential = SequentialDraw(*pots)
+    rng = random.Random(3)
+    draws = np.array([engine.from_groups(sequential.draw(rng)) for _ in range(500)])
+    check_rules(engine, draws)
+    # it only ever reaches placements that some valid draw has
+    seen = group_frequencies(engine, draws) > 0
+    assert (solve(engine).team_group.reshape(-1)[seen] > 0).all()
+
+
+def test_sequential_draw_is_reproducible(pots):
+    sequential = SequentialDraw(*pots)
+    assert sequential.draw(5) == SequentialDraw(*pots).draw(5)
+    assert sequential.draw(random.Random(5)) == sequential.draw(5)
+
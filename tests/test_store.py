@@ -0,0 +1,38 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from wc26 import runner
+from wc26.store import HEADER_JSON, TournamentStore, record, simulate_columns
+
+
+def test_record_round_trip(tournament, tmp_path):
+    n, seed, shard_size = 3000, 5, 1000
+    store = record(tournament, str(tmp_path), n, seed=seed, shard_size=shard_size)
+    reopened = TournamentStore(str(tmp_path))
+    assert len(reopened) == n
+    assert reopened.teams == tournament.engine.teams
+    # the columns are the shards of runner.run, in order
+    seeds = np.random.SeedSequence(seed).spawn(len(runner.shard_sizes(n, shard_size)))
+    shards = [runner.run_shard(simulate_columns, tournament, size, ss)
+              for size, ss in zip(runner.shard_sizes(n, shard_size), seeds)]
+    for name, column in reopened.columns.items():
+        assert np.array_equal(column, np.concatenate([s[name] for s in shards]))
+        assert np.array_equal(column, store.columns[name])
+    champions = sum(reopened.probability(reopened.champion(t)) for t in reopened.teams)
+    assert champions == pytest.approx(1.0)
+
+
+def test_store_with_other_inputs_is_refused(tournament, tmp_path):
+    record(tournament, str(tmp_path), 100)
+    path = os.path.join(tmp_path, HEADER_JSON)
+    with open(path, encoding='utf-8') as f:
+        header = json.load(f)
+    header['inputs']['schedule'] = 'stale'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(header, f)
+    with pytest.raises(ValueError, match='schedule'):
+        TournamentStore(str(tmp_path))
+    assert len(TournamentStore(str(tmp_path), check_inputs=False)) == 100
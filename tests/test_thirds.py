@@ -0,0 +1,36 @@
+import csv
+import itertools
+
+import numpy as np
+
+from wc26.data import GROUPS, THIRD_PLACE_CSV
+from wc26.thirds import NO_GROUP, ThirdPlaceIndex
+
+
+def test_index_matches_csv():
+    with open(THIRD_PLACE_CSV, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [r for r in reader if r]
+    index = ThirdPlaceIndex.from_csv()
+    assert [f'1{GROUPS[g]}' for g in index.winners] == header[1:]
+    assert len(rows) == 495
+    seen = set()
+    for row in rows:
+        mask = sum(1 << GROUPS.index(g) for g in row[0].split())
+        seen.add(mask)
+        assert [f'3{GROUPS[g]}' for g in index.table[mask]] == row[1:]
+    # every other mask is marked as impossible
+    others = np.ones(len(index.table), dtype=bool)
+    others[list(seen)] = False
+    assert (index.table[others] == NO_GROUP).all()
+
+
+def test_every_advancing_set_is_allocated():
+    index = ThirdPlaceIndex.from_csv()
+    winners = index.winners.tolist()
+    for advanced in itertools.combinations(range(len(GROUPS)), 8):
+        row = index.table[sum(1 << g for g in advanced)].tolist()
+        # each advancing third meets exactly one winner, never its own group's
+        assert sorted(row) == list(advanced)
+        assert all(t != w for t, w in zip(row, winners))
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from wc26.store import record
+from wc26.whatif import InGroup, Result, WhatIf
+
+
+@pytest.fixture(scope='module')
+def whatif(tournament, tmp_path_factory):
+    store = record(tournament, str(tmp_path_factory.mktemp('store')), 20_000, seed=1)
+    return WhatIf(store, tournament, min_samples=2000, max_fresh=20_000, seed=2)
+
+
+def test_placement_filters_the_stored_draws(whatif):
+    s = whatif.scenario(InGroup('Spain', 'C'))
+    assert s.method == 'filter'
+    assert s.probability(whatif.store.in_group('Spain', 'C')) == 1
+    assert 0 < len(s) < len(whatif.store)
+
+
+@pytest.mark.parametrize('conditions', [
+    [InGroup('Spain', 'A')],                           # pot 1 slot of a host group
+    [InGroup('Mexico', 'B')],                          # hosts are fixed
+    [InGroup('Spain', 'C'), InGroup('Argentina', 'C')],  # same pot
+    [InGroup('Spain', 'C'), InGroup('Spain', 'D')],
+    [InGroup('Spain', 'C'), Result(1, 'Spain')],       # match 1 is in group A
+])
+def test_impossible_placements_are_rejected(whatif, conditions):
+    with pytest.raises(ValueError):
+        whatif.scenario(*conditions)
+
+
+def test_unreachable_result_raises(whatif):
+    # match 73 is 2A v 2B, and a pot 1 team is never in either group
+    with pytest.raises(ValueError, match='No tournament'):
+        whatif.scenario(Result(73, 'Spain'))
+
+
+def test_knockout_results_are_imposed_round_by_round(whatif):
+    store = whatif.store
+    bracket = whatif.tournament.bracket
+    spain = store.team_index['Spain']
+    final = int(bracket.matches[bracket.final])
+    s = whatif.scenario(Result(final, 'Spain', 'win'))
+    assert s.method == 'resimulate'
+    assert s.probability(store.champion('Spain')) == 1
+    # winning a semi-final puts Spain into the final of every sample
+    j = (bracket.source[bracket.final, 0] - bracket.knockout_base) // 2
+    semi = int(bracket.matches[j])
+    s = whatif.scenario(Result(semi, 'Spain', 'win'))
+    for c in s.chunks:
+        assert (c.table[:, bracket.source[bracket.final]] == spain).any(axis=1).all()
+
+
+def test_group_result_is_imposed(whatif):
+    stage = whatif.tournament.group_stage
+    k = int(np.nonzero(stage.group == 2)[0][0])  # a group C match
+    s = whatif.scenario(InGroup('Spain', 'C'), Result(int(stage.matches[k]), 'Spain', 'loss'))
+    assert len(s) >= whatif.min_samples
+    assert s.probability(whatif.store.in_group('Spain', 'C')) == 1
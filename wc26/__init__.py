@@ -0,0 +1,46 @@
+"""Headless simulation engine for the 2026 World Cup draw and tournament.
+
+Importing the package is cheap: the submodules (and numpy) are only
+imported when one of the names below is first used, and no data is read
+until asked for.  Nothing here imports streamlit, pandas or pycountry.
+
+    import wc26
+    pots, conf_map = wc26.load_pots()
+    engine = wc26.DrawEngine(pots, conf_map)
+"""
+import importlib
+
+__version__ = '0.1.0'
+
+_EXPORTS = {
+    'load_pots': 'data',
+    'make_pots': 'data',
+    'DrawRules': 'rules',
+    'DrawEngine': 'draw',
+    'RestartDraw': 'restart',
+    'SequentialDraw': 'sequential',
+    'DrawAggregator': 'aggregate',
+    'solve': 'exact',
+    'MatchModel': 'match',
+    'GroupStage': 'groups',
+    'ThirdPlaceIndex': 'thirds',
+    'Bracket': 'knockout',
+    'Tournament': 'tournament',
+    'JobManager': 'jobs',
+    'TournamentStore': 'store',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
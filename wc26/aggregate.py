@@ -0,0 +1,97 @@
+"""Streaming, constant-memory aggregation of draw statistics.
+
+A `DrawAggregator` is fed ``(n, groups, slots)`` arrays of team indices as
+they come out of `DrawEngine.draw` and only keeps fixed-size count arrays,
+so its memory is the same for 10k or 100M draws.  Aggregators from
+separate shards merge with ``+`` (or ``+=``), and `snapshot()` gives an
+independent copy that can be shown while the run continues.
+"""
+import numpy as np
+
+from .data import GROUPS
+
+
+class DrawAggregator:
+    """Running counts over draws.
+
+    team_group[t, g]   draws with team t in group g
+    team_slot[t, s]    draws with team t in slot (pot position) s
+    pair[a, b]         draws with teams a and b in the same group
+    conf_group[c, g, k]  draws with exactly k teams of confederation c in group g
+    """
+
+    def __init__(self, team_conf, n_confs=None, n_groups=len(GROUPS), n_slots=4):
+        self.team_conf = np.asarray(team_conf, dtype=np.intp)
+        n_teams = self.team_conf.size
+        n_confs = n_confs if n_confs is not None else int(self.team_conf.max()) + 1
+        self.n = 0
+        self.team_group = np.zeros((n_teams, n_groups), dtype=np.int64)
+        self.team_slot = np.zeros((n_teams, n_slots), dtype=np.int64)
+        self.pair = np.zeros((n_teams, n_teams), dtype=np.int64)
+        self.conf_group = np.zeros((n_confs, n_groups, n_slots + 1), dtype=np.int64)
+
+    @classmethod
+    def for_engine(cls, engine):
+        return cls(engine.team_conf, len(engine.confederations), len(GROUPS), len(engine.pots))
+
+    def add_draws(self, draws):
+        """Count an ``(n, groups, slots)`` array of team indices."""
+        n_teams, n_groups = self.team_group.shape
+        n_confs, _, n_counts = self.conf_group.shape
+        n, _, n_slots = draws.shape
+        teams = draws.astype(np.intp)
+        self.n += n
+        self.team_group += np.bincount(
+            (teams * n_groups + np.arange(n_groups)[:, None]).reshape(-1),
+            minlength=n_teams * n_groups).reshape(n_teams, n_groups)
+        self.team_slot += np.bincount(
+            (teams * n_slots + np.arange(n_slots)).reshape(-1),
+            minlength=n_teams * n_slots).reshape(n_teams, n_slots)
+        for a in range(n_slots):
+            for b in range(a + 1, n_slots):
+                cell = np.bincount((teams[:, :, a] * n_teams + teams[:, :, b]).reshape(-1),
+                                   minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+                self.pair += cell + cell.T
+        confs = self.team_conf[teams]
+        for c in range(n_confs):
+            k = (confs == c).sum(axis=2)
+            self.conf_group[c] += np.bincount((np.arange(n_groups) * n_counts + k).reshape(-1),
+                                              minlength=n_groups * n_counts).reshape(n_groups, n_counts)
+        return self
+
+    def __iadd__(self, other):
+        self.n += other.n
+        self.team_group += other.team_group
+        self.team_slot += other.team_slot
+        self.pair += other.pair
+        self.conf_group += other.conf_group
+        return self
+
+    def __add__(self, other):
+        out = self.snapshot()
+        out += other
+        return out
+
+    def snapshot(self):
+        """Independent copy of the current counts."""
+        out = DrawAggregator.__new__(DrawAggregator)
+        out.team_conf = self.team_conf
+        out.n = self.n
+        out.team_group = self.team_group.copy()
+        out.team_slot = self.team_slot.copy()
+        out.pair = self.pair.copy()
+        out.conf_group = self.conf_group.copy()
+        return out
+
+    def group_probabilities(self):
+        return self.team_group / max(self.n, 1)
+
+    def slot_probabilities(self):
+        return self.team_slot / max(self.n, 1)
+
+    def meet_probabilities(self):
+        return self.pair / max(self.n, 1)
+
+    def conf_distribution(self):
+        """``[c, g, k]``: probability of exactly k teams of confederation c in group g."""
+        return self.conf_group / max(self.n, 1)
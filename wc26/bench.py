@@ -0,0 +1,206 @@
+"""Offline benchmark suite with regression gates.
+
+Runs against the bundled `data/*.csv` and writes every measurement as
+machine-readable JSON, ``{name: {value, unit, better}}`` plus the
+environment it ran in:
+
+    draw.restart.*      single `RestartDraw.draw` latency (p50/p99/max, slowest seed)
+    draw.sequential.*   single `SequentialDraw.draw` latency
+    draw.batch_<n>      `DrawEngine.draw` draws/s at batch sizes 1 .. 1M
+    groups, knockout    group stages/s and brackets/s
+    tournament          full tournaments/s (one process)
+    import.*            cold import time in a fresh interpreter
+    peak_rss_mb         peak resident memory of the benchmark process
+
+    python -m wc26.bench --output bench.json
+    python -m wc26.bench --baseline bench.json --threshold 0.15
+
+With `--baseline` the run exits with status 1 when any metric is worse
+than the baseline by more than `--threshold` (a fraction), so a build can
+fail on a throughput regression.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from . import __version__
+from .data import QUALIFIED_CSV, RANKINGS_CSV, SCHEDULE_CSV, content_digest, load_pots
+from .draw import DrawEngine
+from .restart import RestartDraw
+from .sequential import SequentialDraw
+from .tournament import Tournament, tally_tournaments
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_BATCH_SIZES = (1, 100, 10_000, 100_000)
+
+
+def timed(fn, min_time=0.5, max_repeats=1000):
+    """Seconds per call of `fn()`, repeated until `min_time` has passed."""
+    times = []
+    start = time.perf_counter()
+    while not times or (time.perf_counter() - start < min_time and len(times) < max_repeats):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def _latencies(draw, seeds):
+    times = []
+    for seed in seeds:
+        t = time.perf_counter()
+        draw(seed)
+        times.append(time.perf_counter() - t)
+    return np.array(times)
+
+
+def bench_latency(metrics, name, draw, n):
+    """Latency distribution of `n` single draws, one seed each."""
+    times = _latencies(draw, range(n))
+    metrics[f'{name}.p50_ms'] = _metric(np.percentile(times, 50) * 1e3, 'ms', 'lower')
+    metrics[f'{name}.p99_ms'] = _metric(np.percentile(times, 99) * 1e3, 'ms', 'lower')
+    # a single maximum is too noisy to gate a build on
+    metrics[f'{name}.max_ms'] = _metric(times.max() * 1e3, 'ms', 'lower', gate=False)
+    # the slowest seed takes the worst retry path; time it again so one
+    # scheduler hiccup is not reported as the worst case
+    worst = int(times.argmax())
+    again = _latencies(draw, [worst] * 5)
+    metrics[f'{name}.worst_seed_ms'] = _metric(np.median(again) * 1e3, 'ms', 'lower', seed=worst)
+
+
+def bench_batches(metrics, engine, sizes, min_time):
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        times = timed(lambda: engine.draw(n, rng), min_time)
+        metrics[f'draw.batch_{n}'] = _metric(n / np.median(times), 'draws/s', 'higher')
+
+
+def bench_stages(metrics, tournament, n, min_time):
+    rng = np.random.default_rng(0)
+    draws = tournament.draws(n, rng)
+    times = timed(lambda: tournament.group_stage.simulate(draws, rng), min_time)
+    metrics['groups'] = _metric(n / np.median(times), 'group stages/s', 'higher')
+    results = tournament.group_stage.simulate(draws, rng)
+    times = timed(lambda: tournament.bracket.simulate(results, rng), min_time)
+    metrics['knockout'] = _metric(n / np.median(times), 'brackets/s', 'higher')
+    times = timed(lambda: tally_tournaments(tournament, n, rng), min_time)
+    metrics['tournament'] = _metric(n / np.median(times), 'tournaments/s', 'higher')
+
+
+def bench_import(metrics, repeats=5):
+    """Import time in a fresh interpreter (median of `repeats`)."""
+    statements = {
+        'import.wc26': 'import wc26',
+        'import.tournament': 'import wc26.tournament',
+    }
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (ROOT_DIR, os.environ.get('PYTHONPATH')) if p))
+    for name, statement in statements.items():
+        code = (f'import time; t = time.perf_counter(); {statement}; '
+                'print(time.perf_counter() - t)')
+        times = [float(subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                                      capture_output=True, text=True).stdout)
+                 for _ in range(repeats)]
+        metrics[f'{name}_ms'] = _metric(np.median(times) * 1e3, 'ms', 'lower')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def run(quick=False, min_time=0.5):
+    """Run the whole suite; returns the JSON-ready report."""
+    pots, conf_map = load_pots()
+    engine = DrawEngine(pots, conf_map)
+    tournament = Tournament(engine)
+    metrics = {}
+    n_single = 200 if quick else 2000
+    restart = RestartDraw(pots, conf_map)
+    bench_latency(metrics, 'draw.restart', lambda s: restart.draw(random.Random(s)), n_single)
+    sequential = SequentialDraw(pots, conf_map)
+    bench_latency(metrics, 'draw.sequential', lambda s: sequential.draw(random.Random(s)), n_single)
+    bench_batches(metrics, engine, QUICK_BATCH_SIZES if quick else BATCH_SIZES, min_time)
+    bench_stages(metrics, tournament, 4096 if quick else engine.batch_size, min_time)
+    bench_import(metrics, 3 if quick else 5)
+    rss = peak_rss_mb()
+    if rss is not None:
+        metrics['peak_rss_mb'] = _metric(rss, 'MB', 'lower')
+    return {
+        'version': __version__,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'quick': quick,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'data': content_digest(QUALIFIED_CSV, RANKINGS_CSV, SCHEDULE_CSV),
+        'metrics': metrics,
+    }
+
+
+def compare(report, baseline, threshold=0.1):
+    """Metrics worse than `baseline` by more than `threshold`: ``[(name, value, base)]``."""
+    regressions = []
+    for name, m in report['metrics'].items():
+        base = baseline.get('metrics', {}).get(name)
+        if base is None or not base['value'] or not m.get('gate', True):
+            continue
+        if m['better'] == 'higher':
+            worse = m['value'] < base['value'] * (1 - threshold)
+        else:
+            worse = m['value'] > base['value'] * (1 + threshold)
+        if worse:
+            regressions.append((name, m['value'], base['value']))
+    return regressions
+
+
+def _metric(value, unit, better, **extra):
+    return dict(value=round(float(value), 6), unit=unit, better=better, **extra)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the draw and tournament engines.')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed fraction a metric may be worse than the baseline')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes for a fast check')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='seconds to repeat each throughput measurement')
+    args = parser.parse_args(argv)
+
+    report = run(args.quick, args.min_time)
+    for name, m in report['metrics'].items():
+        print(f"{name:<32}{m['value']:>16,.3f} {m['unit']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, value, base in regressions:
+            print(f'REGRESSION {name}: {value:,.3f} vs {base:,.3f}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
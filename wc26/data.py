@@ -0,0 +1,151 @@
+"""Loading of the bundled CSV data and pot construction."""
+import csv
+import functools
+import hashlib
+import os
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+RANKINGS_CSV = os.path.join(DATA_DIR, 'rankings.csv')
+QUALIFIED_CSV = os.path.join(DATA_DIR, 'qualified.csv')
+SCHEDULE_CSV = os.path.join(DATA_DIR, 'schedule.csv')
+THIRD_PLACE_CSV = os.path.join(DATA_DIR, '3rdplace.csv')
+RANKINGS_HISTORY = os.path.join(DATA_DIR, 'rankings_history.npz')
+
+GROUPS = [chr(ord('A') + i) for i in range(12)]  # A..L (12 groups)
+
+# hosts are drawn straight into position 1 of their groups
+FIXED_GROUPS = {'Mexico': 'A', 'Canada': 'B', 'United States': 'D'}
+
+
+def load_qualified(path=QUALIFIED_CSV):
+    """Return (teams, conf_map) read from `qualified.csv`."""
+    if not os.path.exists(path):
+        return [], {}
+    teams = []
+    conf_map = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            teams.append(row['team'])
+            if row.get('confederation'):
+                conf_map[row['team']] = row['confederation']
+    return teams, conf_map
+
+
+def load_rankings(path=RANKINGS_CSV):
+    """Return team names from `rankings.csv` in ranking order."""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['team'] for row in csv.DictReader(f)]
+
+
+def load_ranks(path=RANKINGS_CSV):
+    """Return ``{team: rank}`` from the ``rank`` column of `rankings.csv`."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['team']: int(row['rank']) for row in csv.DictReader(f)}
+
+
+def load_schedule(path=SCHEDULE_CSV):
+    """Return the rows of `schedule.csv` as dicts, in match order."""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return sorted(rows, key=lambda r: int(r['match']))
+
+
+def file_signature(*paths):
+    """Cheap per-file ``(path, mtime_ns, size)`` key; changes whenever a file is rewritten."""
+    out = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            out.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append((path, None, None))
+    return tuple(out)
+
+
+def content_digest(*paths):
+    """SHA-1 over the contents of `paths` (missing files count as empty)."""
+    h = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def load_pots(qualified_path=QUALIFIED_CSV, rankings_path=RANKINGS_CSV, as_of=None,
+              history_path=RANKINGS_HISTORY):
+    """Return (pots, conf_map) built from the csv files; cached until either file changes.
+
+    With `as_of` (a date) the ranking order comes from the release in force
+    on that day in the ranking history (see `wc26.rankings`) instead of
+    `rankings.csv`.
+    """
+    if as_of is None:
+        return _load_pots(file_signature(qualified_path, rankings_path))
+    return _load_pots(file_signature(qualified_path, history_path), str(as_of))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_pots(signature, as_of=None):
+    (qualified_path, _, _), (rankings_path, _, _) = signature
+    qualified, conf_map = load_qualified(qualified_path)
+    if as_of is None:
+        ranked = load_rankings(rankings_path)
+    else:
+        from .rankings import RankingHistory
+        ranked = RankingHistory.load(rankings_path).ranked(as_of)
+    return make_pots(qualified, ranked), conf_map
+
+
+def make_pots(qualified, ranked):
+    # produce list of qualified teams ordered by ranking
+    # teams present in both rankings and qualified, preserving ranking order
+    qualified_set = set(qualified)
+    rank_order = [r for r in ranked if r in qualified_set]
+    # append any qualified teams missing from rankings at the end (to avoid losing them)
+    ranked_set = set(rank_order)
+    missing_from_rankings = [q for q in qualified if q not in ranked_set]
+    if missing_from_rankings:
+        rank_order.extend(missing_from_rankings)
+    # Ensure Mexico/Canada/United States present as A1/B1/D1
+    pot1 = []
+    for special in FIXED_GROUPS:
+        if special in qualified_set:
+            pot1.append(special)
+
+    # add top-ranked qualified teams excluding specials until we have 12
+    in_pot1 = set(pot1)
+    for t in rank_order:
+        if t in in_pot1:
+            continue
+        if len(pot1) >= 12:
+            break
+        pot1.append(t)
+        in_pot1.add(t)
+
+    # Next pots: sequential in ranking order skipping pot1 teams
+    remaining = [t for t in rank_order if t not in in_pot1]
+    pot2 = remaining[:12]
+    pot3 = remaining[12:24]
+    pot4_real = remaining[24:]
+    # Fill pot4 with placeholders to reach 12
+    pot4 = pot4_real.copy()
+    # placeholders: 4 UEFA PO winners, 2 intercontinental
+    placeholders = [f'UEFA Path {i+1}' for i in range(4)] + [f'IC Winner {i+1}' for i in range(2)]
+    for ph in placeholders:
+        if len(pot4) >= 12:
+            break
+        pot4.append(ph)
+    # if still less than 12, pad with generic placeholders
+    while len(pot4) < 12:
+        pot4.append(f'Pot4 Placeholder {len(pot4)+1}')
+
+    return pot1, pot2, pot3, pot4
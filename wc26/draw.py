@@ -0,0 +1,201 @@
+"""Vectorised batch draw engine.
+
+`DrawEngine.draw(n)` returns an ``(n, 12, 4)`` array of team indices
+(groups A..L x pot slots) for `n` complete draws at once.  Each pot is drawn
+for every pending draw in lock-step with the same process as the app's
+`assign_pot_with_rules`: forced (single-option) teams first, otherwise a
+random team into a random group that respects the confederation limits.
+Draws that hit a dead end retry the pot, and draws whose pot keeps failing
+are restarted from scratch, mirroring the retry loops of the app.
+"""
+import numpy as np
+
+from . import instrument
+from .data import FIXED_GROUPS, GROUPS
+from .rules import DrawRules
+
+
+class DrawEngine:
+    """Draw engine compiled once from the four pots and the confederation map."""
+
+    def __init__(self, pots, conf_map, fixed=FIXED_GROUPS, max_pot_attempts=500,
+                 max_restarts=300, batch_size=16384):
+        self.pots = [list(p) for p in pots]
+        if len(self.pots) != 4 or any(len(p) != len(GROUPS) for p in self.pots):
+            raise ValueError('expected 4 pots of 12 teams')
+        self.teams = [t for pot in self.pots for t in pot]
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.max_pot_attempts = max_pot_attempts
+        self.max_restarts = max_restarts
+        self.batch_size = batch_size
+
+        self.rules = DrawRules(self.teams, conf_map, n_groups=len(GROUPS))
+        self.confederations = self.rules.confederations
+        self.team_conf = np.array(self.rules.team_conf, dtype=np.intp)
+        self.conf_limit = np.array(self.rules.conf_limit, dtype=np.int8)
+        self.conf_exempt = np.array(self.rules.conf_exempt)
+
+        # per pot: fixed (team, group) placements and the teams left to draw
+        self._fixed = []
+        self._free = []
+        for p, pot in enumerate(self.pots):
+            fixed_here = [(self.team_index[t], GROUPS.index(g)) for t, g in fixed.items()
+                          if t in pot and g in GROUPS]
+            fixed_teams = {t for t, _ in fixed_here}
+            self._fixed.append(fixed_here)
+            self._free.append(np.array([i for i in range(p * 12, (p + 1) * 12)
+                                        if i not in fixed_teams], dtype=np.intp))
+
+    def draw(self, n, rng=None):
+        """Return an ``(n, 12, 4)`` uint8 array of team indices for `n` draws.
+
+        `rng` may be a NumPy Generator, a seed or None.
+        """
+        rng = np.random.default_rng(rng)
+        out = np.empty((n, len(GROUPS), 4), dtype=np.uint8)
+        for start in range(0, n, self.batch_size):
+            stop = min(n, start + self.batch_size)
+            out[start:stop] = self._draw_batch(stop - start, rng)
+        return out
+
+    def to_groups(self, draw):
+        """Convert one ``(12, 4)`` draw into the app's ``{group: [team, ...]}`` form."""
+        return {g: [self.teams[i] for i in draw[gi]] for gi, g in enumerate(GROUPS)}
+
+    def from_groups(self, groups):
+        """Inverse of `to_groups`: a ``(12, 4)`` array of team indices."""
+        return np.array([[self.team_index[t] for t in groups[g]] for g in GROUPS], dtype=np.uint8)
+
+    def _draw_batch(self, m, rng):
+        out = np.empty((m, len(GROUPS), 4), dtype=np.uint8)
+        pending = np.arange(m)
+        if instrument.enabled:
+            instrument.count('engine.rows', m)
+        for restart in range(self.max_restarts):
+            if instrument.enabled and restart:
+                instrument.count('engine.restarts', pending.size)
+            res, ok = self._draw_rows(pending.size, rng)
+            out[pending[ok]] = res[ok]
+            pending = pending[~ok]
+            if not pending.size:
+                return out
+        raise RuntimeError('Unable to produce a valid draw respecting confederation '
+                           'rules after several attempts.')
+
+    def _draw_rows(self, m, rng):
+        """Draw all four pots for `m` rows; returns (draws, ok mask)."""
+        out = np.zeros((m, len(GROUPS), 4), dtype=np.uint8)
+        counts = np.zeros((m, len(GROUPS), len(self.confederations)), dtype=np.int8)
+        closed = np.zeros((m, len(self.confederations)), dtype=np.intp)
+        alive = np.ones(m, dtype=bool)
+        for p in range(4):
+            pending = np.flatnonzero(alive)
+            for attempt in range(self.max_pot_attempts):
+                if not pending.size:
+                    break
+                if instrument.enabled and attempt:
+                    instrument.count(f'engine.pot{p + 1}.retries', pending.size)
+                placed, cnt, cls, ok = self._place_pot(p, counts[pending], closed[pending], rng)
+                done = pending[ok]
+                out[done, :, p] = placed[ok]
+                counts[done] = cnt[ok]
+                closed[done] = cls[ok]
+                pending = pending[~ok]
+            alive[pending] = False
+        return out, alive
+
+    def _place_pot(self, p, counts, closed, rng):
+        """Place pot `p` into every row of `counts`/`closed` (updated copies are returned).
+
+        Follows `assign_pot_with_rules`: a team with a single possible group
+        is placed first, otherwise a random team goes to a random allowed
+        group.  Teams of one confederation are interchangeable for the
+        rules, so the state is tracked per confederation and the actual team
+        is taken from a per-row shuffled queue.  Free groups and groups
+        closed to each confederation (`closed`) are 12-bit masks, so every
+        step is a handful of array operations over the rows.
+        """
+        m = counts.shape[0]
+        rows = np.arange(m)
+        n_conf = len(self.confederations)
+        limit = np.where(self.conf_exempt, np.iinfo(np.int8).max, self.conf_limit)
+        flat_counts = counts.reshape(-1)
+        # (conf, row) layout keeps the per-step reductions over short, contiguous axes
+        closed = np.ascontiguousarray(closed.T)
+        flat_closed = closed.reshape(-1)
+
+        placed = np.zeros((m, len(GROUPS)), dtype=np.intp)
+        open_ = np.full(m, _ALL_GROUPS, dtype=np.intp)
+        for t, g in self._fixed[p]:
+            conf = self.team_conf[t]
+            placed[:, g] = t
+            open_ &= ~(1 << g)
+            counts[:, g, conf] += 1
+            closed[conf] |= np.where(counts[:, g, conf] >= limit[conf], 1 << g, 0)
+
+        # free teams grouped by confederation, shuffled within each block
+        free = self._free[p]
+        free = free[np.argsort(self.team_conf[free], kind='stable')]
+        pot_confs, block_start, block_size = np.unique(
+            self.team_conf[free], return_index=True, return_counts=True)
+        queue = np.empty((m, free.size), dtype=np.intp)
+        for start, size in zip(block_start, block_size):
+            queue[:, start:start + size] = rng.permuted(
+                np.tile(free[start:start + size], (m, 1)), axis=1)
+        remaining = np.repeat(block_size[:, None], m, axis=1)
+        flat_remaining = remaining.reshape(-1)
+
+        ok = np.ones(m, dtype=bool)
+        for s in range(free.size):
+            allowed = open_ & ~closed[pot_confs]
+            n_allowed = _POPCOUNT[allowed]
+            waiting = remaining > 0
+            ok &= ~(waiting & (n_allowed == 0)).any(axis=0)
+            forced = waiting & (n_allowed == 1)
+            has_forced = forced.any(axis=0)
+            # otherwise a random remaining team: its block is chosen by size
+            pick = rng.random(m) * (free.size - s)
+            b = np.zeros(m, dtype=np.intp)
+            seen = np.zeros(m, dtype=np.intp)
+            for j in range(pot_confs.size - 1):
+                seen += remaining[j]
+                b += seen <= pick
+            for j in range(pot_confs.size - 1, -1, -1):
+                b[forced[j]] = j
+
+            at = b * m + rows
+            options = allowed.reshape(-1)[at]
+            k = (rng.random(m) * n_allowed.reshape(-1)[at]).astype(np.intp)
+            g = _SELECT[options, np.where(has_forced, 0, k)]
+            team = queue[rows, block_start[b] + block_size[b] - flat_remaining[at]]
+            flat_remaining[at] -= 1
+            conf = pot_confs[b]
+            placed[rows, g] = team
+            bit = _GROUP_BITS[g]
+            open_ &= ~bit
+            count_at = (rows * len(GROUPS) + g) * n_conf + conf
+            flat_counts[count_at] += 1
+            full = flat_counts[count_at] >= limit[conf]
+            flat_closed[conf * m + rows] |= bit * full
+        return placed, counts, closed.T, ok
+
+
+def _select_table(n_groups):
+    """Return (popcount, select) lookup tables over all `n_groups`-bit masks.
+
+    ``select[mask, k]`` is the k-th set bit of `mask`; rows with fewer set
+    bits are padded with 0 so dead-end rows still index safely.
+    """
+    size = 1 << n_groups
+    popcount = np.zeros(size, dtype=np.intp)
+    select = np.zeros((size, n_groups), dtype=np.intp)
+    for mask in range(size):
+        bits = [g for g in range(n_groups) if mask >> g & 1]
+        popcount[mask] = len(bits)
+        select[mask, :len(bits)] = bits
+    return popcount, select
+
+
+_GROUP_BITS = 1 << np.arange(len(GROUPS), dtype=np.intp)
+_ALL_GROUPS = (1 << len(GROUPS)) - 1
+_POPCOUNT, _SELECT = _select_table(len(GROUPS))
@@ -0,0 +1,483 @@
+"""Exact draw probabilities.
+
+Computes the distribution of the draw process used by `DrawEngine` (and by
+the app's `assign_pot_with_rules`) exactly instead of by sampling.
+
+Teams of one confederation within a pot are interchangeable for the rules,
+and so are groups that are equally constrained for the rest of the draw, so
+the search runs pot by pot over canonical states: the sorted signatures of
+the groups.  A signature only keeps what can still bite: for every
+confederation, how close the group is to its limit measured against the
+number of later pots that contain that confederation.  Alongside the
+probability of each state the search carries the expected number of groups
+with every pot-by-pot history (confederation drawn from each pot), which is
+linear and so never enlarges the state; team -> group and team-pair
+probabilities are read off the final histories.
+
+Pot restarts condition each pot on success from its starting state and
+whole-draw restarts condition the draw on never reaching a dead end; both
+show up as renormalisations.  (The retry limits of the samplers are
+treated as unbounded.)
+
+The search takes about a minute for the real pots, but its result (the
+histories) only depends on the canonical structure of the draw: the
+confederation blocks of every pot, the confederation limits and the fixed
+placements, not on team names or group labels.  `solve` memoises it on
+that key, in the process and in `data/exact_draw.json`, which ships with
+the result for the current pots, so a call for known pots is instant.
+"""
+import hashlib
+import json
+import math
+import os
+from collections import defaultdict
+
+import numpy as np
+
+from .data import DATA_DIR, GROUPS
+
+CACHE_JSON = os.path.join(DATA_DIR, 'exact_draw.json')
+CACHE_VERSION = 1  # bump when the search changes what it computes
+_memo = {}  # canonical key digest -> histories
+
+
+class DrawProbabilities:
+    """Exact team -> group and team-pair probabilities for one set of pots."""
+
+    def __init__(self, teams, team_group, pair):
+        self.teams = teams
+        self.team_index = {t: i for i, t in enumerate(teams)}
+        # team_group[i, g]: P(team i drawn into group g)
+        self.team_group = team_group
+        # pair[i, j]: P(teams i and j drawn into the same group)
+        self.pair = pair
+
+    def group_probabilities(self, team):
+        row = self.team_group[self.team_index[team]]
+        return {g: float(p) for g, p in zip(GROUPS, row)}
+
+    def meet_probability(self, team_a, team_b):
+        return float(self.pair[self.team_index[team_a], self.team_index[team_b]])
+
+
+def solve(engine, path=CACHE_JSON):
+    """Return the exact `DrawProbabilities` for a compiled `DrawEngine`.
+
+    Histories are looked up by the solver's canonical key, first in this
+    process and then in the cache file at `path` (None to skip it); a new
+    result is added to the file.
+    """
+    solver = _Solver(engine)
+    key = solver.key()
+    histories = _memo.get(key)
+    if histories is None:
+        stored = _load_cache(path)
+        if key in stored:
+            histories = {tuple(hist): c for hist, c in stored[key]}
+        else:
+            histories = solver.histories()
+            stored[key] = [[list(hist), c] for hist, c in histories.items()]
+            _save_cache(path, stored)
+        _memo[key] = histories
+    return solver.run(histories)
+
+
+def _load_cache(path):
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path, stored):
+    if path is None:
+        return
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f)
+    except OSError:
+        pass  # read-only checkout: keep the result in this process only
+
+
+class _Solver:
+    """Memoised pot-by-pot search over canonical draw states.
+
+    A group signature `d` holds, per confederation, ``max(0, count - limit +
+    k)`` where `k` is the number of pots from the current one on that still
+    contain the confederation: the group is closed to it when ``d == k``,
+    and groups that cannot reach the limit any more all share ``d == 0``.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        n_conf = len(engine.confederations)
+        for p, fixed in enumerate(engine._fixed):
+            if fixed and p:
+                raise ValueError('fixed placements are only supported in the first pot')
+        self.fixed_team = {g: t for t, g in engine._fixed[0]}
+        self.limits = [None if ex else lim for lim, ex in zip(engine.conf_limit.tolist(),
+                                                              engine.conf_exempt.tolist())]
+        # per pot: (confederation, number of free teams) blocks
+        self.blocks = []
+        for p in range(4):
+            confs, sizes = np.unique(engine.team_conf[engine._free[p]], return_counts=True)
+            self.blocks.append(list(zip(confs.tolist(), sizes.tolist())))
+        # k[p][c]: pots from p on containing confederation c (0 when unlimited)
+        self.k = []
+        for p in range(5):
+            self.k.append(tuple(
+                sum(c in dict(blocks) for blocks in self.blocks[p:]) if self.limits[c] else 0
+                for c in range(n_conf)))
+        self._fill = {}
+        self._outcomes = {}
+        self._splits = {}
+        self._last = {}
+
+    def key(self):
+        """Digest of everything `histories` depends on."""
+        # which group a fixed team sits in does not change the histories
+        fixed = sorted((t, int(self.engine.team_conf[t])) for t in self.fixed_team.values())
+        canonical = (CACHE_VERSION, len(GROUPS), self.limits, self.blocks, fixed)
+        return hashlib.sha256(repr(canonical).encode()).hexdigest()
+
+    def initial_sig(self, counts):
+        return tuple(max(0, n - lim + k) if lim else 0
+                     for n, lim, k in zip(counts, self.limits, self.k[0]))
+
+    def accepts(self, sig, conf, p):
+        return not self.limits[conf] or sig[conf] < self.k[p][conf]
+
+    def fill(self, sig, conf, p):
+        """Signature for pot p + 1 of a group taking a team of `conf` in pot `p`."""
+        key = (sig, conf, p)
+        filled = self._fill.get(key)
+        if filled is None:
+            pot_confs = dict(self.blocks[p])
+            filled = self._fill[key] = tuple(n if c == conf or c not in pot_confs else max(0, n - 1)
+                                             for c, n in enumerate(sig))
+        return filled
+
+    def mask(self, sig, p):
+        """Bitmask of the blocks of pot `p` a group with signature `sig` accepts."""
+        return sum(1 << j for j, (conf, _) in enumerate(self.blocks[p])
+                   if self.accepts(sig, conf, p))
+
+    def pot_outcomes(self, p, masks, sizes):
+        """Coarse outcome distribution of pot `p`, conditioned on success.
+
+        Within a pot every group takes exactly one team, so an open group
+        only matters through the bitmask of pot blocks it accepts.  `masks`
+        and `sizes` give the distinct masks and how many open groups have
+        each.  Returns ``({n: probability}, success)`` where ``n[i][j]`` is
+        the number of groups of mask `i` that took a team of block `j`.
+        """
+        memo_key = (p, masks, sizes)
+        cached = self._outcomes.get(memo_key)
+        if cached is not None:
+            return cached
+        chain = _PotChain(masks, sizes, [n for _, n in self.blocks[p]])
+
+        # n is packed into one integer, one mixed-radix digit per (mask, block) cell
+        radix = [min(sizes[i], chain.totals[j]) + 1 for i, j in chain.cells]
+        weight = [math.prod(radix[:c]) for c in range(len(radix))]
+        dtype = np.int64 if math.prod(radix) < 1 << 62 else object
+        cell_weight = np.array(weight, dtype=dtype)
+
+        # many outcomes n share each process state; n determines the state
+        codes = np.zeros(1, dtype=dtype)
+        states = np.array([chain.start])
+        probs = np.ones(1)
+        for _ in range(sum(chain.totals)):
+            # moves are worked out once per process state, then applied to its rows
+            unique, row_state = np.unique(states, return_inverse=True)
+            cell, src, q, targets = chain.moves(unique)
+            n_moves = np.bincount(src, minlength=unique.size)
+            first_move = np.cumsum(n_moves) - n_moves
+            per_row = n_moves[row_state]
+            rows = np.repeat(np.arange(states.size), per_row)
+            move = (first_move[row_state][rows]
+                    + np.arange(rows.size) - np.repeat(np.cumsum(per_row) - per_row, per_row))
+            codes, first, inverse = np.unique(codes[rows] + cell_weight[cell[move]],
+                                              return_index=True, return_inverse=True)
+            states = targets[move][first]
+            probs = np.bincount(inverse.reshape(-1), probs[rows] * q[move])
+
+        success = float(probs.sum())
+        outcomes = {}
+        for code, prob in zip(codes.tolist(), probs.tolist()):
+            n = [[0] * len(chain.totals) for _ in masks]
+            for (i, j), w, r in zip(chain.cells, weight, radix):
+                n[i][j] = code // w % r
+            outcomes[tuple(map(tuple, n))] = prob / success
+        result = (outcomes, success)
+        self._outcomes[memo_key] = result
+        return result
+
+    def last_pot(self, p, masks, sizes):
+        """Block distribution of a single group of each mask in the final pot.
+
+        Nothing after the last pot depends on the other groups, and a
+        group's chance of taking block `j` is ``E[n[i][j]] / sizes[i]``,
+        which is linear, so this runs over the process states alone: forward
+        probabilities times backward success probabilities.  Returns
+        ``(rows, success)`` with ``rows[i][j]`` conditioned on success.
+        """
+        memo_key = (p, masks, sizes)
+        cached = self._last.get(memo_key)
+        if cached is not None:
+            return cached
+        chain = _PotChain(masks, sizes, [n for _, n in self.blocks[p]])
+
+        # forward: probability of reaching each process state
+        layers = [(np.array([chain.start]), np.ones(1))]
+        steps = []
+        for _ in range(sum(chain.totals)):
+            states, probs = layers[-1]
+            cell, src, q, targets = chain.moves(states)
+            nxt, inverse = np.unique(targets, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            layers.append((nxt, np.bincount(inverse, probs[src] * q, minlength=nxt.size)))
+            steps.append((cell, src, q, inverse))
+        # backward: probability of finishing the pot from each state
+        finish = np.ones(layers[-1][0].size)
+        by_cell = np.zeros(len(chain.cells))
+        for (states, probs), (cell, src, q, inverse) in zip(layers[-2::-1], steps[::-1]):
+            after = q * finish[inverse]
+            by_cell += np.bincount(cell, probs[src] * after, minlength=len(chain.cells))
+            finish = np.bincount(src, after, minlength=states.size)
+        rows = np.zeros((len(masks), len(chain.totals)))
+        for (i, j), x in zip(chain.cells, by_cell.tolist()):
+            rows[i, j] = x
+
+        success = float(finish[0])
+        if success:
+            rows /= success * np.array(sizes)[:, None]
+        result = (rows.tolist(), success)
+        self._last[memo_key] = result
+        return result
+
+    def splits(self, p, members, counts):
+        """Ways the groups of one mask class split over the blocks of pot `p`.
+
+        Given the coarse outcome, which groups of a class took which block is
+        a uniformly random partition with block sizes `counts`.  `members` is
+        the sorted tuple of (signature, multiplicity) in the class.  Returns
+        a list of (filled signatures, probability, ``{(sig, block): groups}``).
+        """
+        memo_key = (p, members, counts)
+        cached = self._splits.get(memo_key)
+        if cached is not None:
+            return cached
+        confs = [conf for conf, _ in self.blocks[p]]
+        base = math.prod(math.factorial(c) for c in counts) / math.factorial(sum(counts))
+        out = []
+
+        def split(i, left, filled, taken, weight):
+            if i == len(members):
+                out.append((tuple(filled), weight * base, taken))
+                return
+            sig, mult = members[i]
+            for parts in _compositions(mult, left):
+                w = math.factorial(mult)
+                nxt_filled = list(filled)
+                nxt_taken = dict(taken)
+                for j, x in enumerate(parts):
+                    if x:
+                        w /= math.factorial(x)
+                        nxt_filled.extend([self.fill(sig, confs[j], p)] * x)
+                        nxt_taken[sig, j] = x
+                split(i + 1, tuple(c - x for c, x in zip(left, parts)),
+                      nxt_filled, nxt_taken, weight * w)
+
+        split(0, counts, [], {}, 1.0)
+        self._splits[memo_key] = out
+        return out
+
+    def classes(self, open_sigs, p):
+        """Group open signatures by the blocks of pot `p` they accept."""
+        classes = defaultdict(lambda: defaultdict(int))
+        for sig in open_sigs:
+            classes[self.mask(sig, p)][sig] += 1
+        masks = tuple(sorted(classes))
+        members = [tuple(sorted(classes[m].items())) for m in masks]
+        sizes = tuple(sum(n for _, n in mem) for mem in members)
+        return masks, members, sizes
+
+    def histories(self):
+        """Expected number of groups with each pot-by-pot history.
+
+        A history holds the confederation drawn into the group from each
+        pot, or ``~team`` for a fixed team.
+        """
+        open_sigs = []
+        done_sigs = []
+        counts = defaultdict(float)
+        n_conf = len(self.engine.confederations)
+        for g in range(len(GROUPS)):
+            counts_here = [0] * n_conf
+            if g in self.fixed_team:
+                # fixed teams fill their slot in the first pot
+                t = self.fixed_team[g]
+                conf = int(self.engine.team_conf[t])
+                counts_here[conf] += 1
+                sig = self.fill(self.initial_sig(counts_here), conf, 0)
+                done_sigs.append(sig)
+                counts[sig, (~t,)] += 1
+            else:
+                sig = self.initial_sig(counts_here)
+                open_sigs.append(sig)
+                counts[sig, ()] += 1
+        # canonical state -> [probability, {(sig, history): expected groups * probability}]
+        dist = {(tuple(sorted(open_sigs)), tuple(sorted(done_sigs))): [1.0, counts]}
+
+        for p in range(3):
+            nxt = defaultdict(lambda: [0.0, defaultdict(float)])
+            for (open_sigs, done_sigs), (prob, counts) in dist.items():
+                masks, members, sizes = self.classes(open_sigs, p)
+                outcomes, success = self.pot_outcomes(p, masks, sizes)
+                n_open = defaultdict(int)
+                for sig in open_sigs:
+                    n_open[sig] += 1
+                for n, q in outcomes.items():
+                    # combine the independent per-class splits; `taken` is
+                    # summed over the combinations, weighted by probability
+                    partial = {(): (1.0, {})}
+                    for mem, row in zip(members, n):
+                        step = defaultdict(lambda: [0.0, defaultdict(float)])
+                        for filled, (w, taken) in partial.items():
+                            for more, r, new in self.splits(p, mem, row):
+                                entry = step[tuple(sorted(filled + more))]
+                                entry[0] += w * r
+                                for key, x in taken.items():
+                                    entry[1][key] += x * r
+                                for key, x in new.items():
+                                    entry[1][key] += w * r * x
+                        partial = step
+                    for filled, (w, taken) in partial.items():
+                        entry = nxt[tuple(sorted(filled + done_sigs)), ()]
+                        entry[0] += prob * q * w
+                        for (sig, hist), c in counts.items():
+                            if len(hist) > p:
+                                entry[1][sig, hist] += c * q * w
+                                continue
+                            for j, (conf, _) in enumerate(self.blocks[p]):
+                                x = taken.get((sig, j))
+                                if x:
+                                    entry[1][self.fill(sig, conf, p), hist + (conf,)] += (
+                                        c * q * x / n_open[sig])
+            dist = nxt
+
+        # last pot: only each group's own token is still needed
+        total = 0.0
+        final = defaultdict(float)
+        for (open_sigs, _), (prob, counts) in dist.items():
+            masks, members, sizes = self.classes(open_sigs, 3)
+            rows, success = self.last_pot(3, masks, sizes)
+            if not success:
+                continue
+            total += prob
+            for (sig, hist), c in counts.items():
+                row = rows[masks.index(self.mask(sig, 3))]
+                for (conf, _), q in zip(self.blocks[3], row):
+                    if q:
+                        final[hist + (conf,)] += c * q
+        # whole-draw restarts: condition on the draw completing
+        if not total:
+            raise RuntimeError('No valid draw exists for these pots.')
+        return {hist: c / total for hist, c in final.items()}
+
+    def run(self, histories=None):
+        engine = self.engine
+        n_teams = len(engine.teams)
+        # token of every team and how many teams of its pot share it
+        team_token = []
+        share = defaultdict(int)
+        for t in range(n_teams):
+            tok = ~t if t in self.fixed_team.values() else int(engine.team_conf[t])
+            team_token.append((t // 12, tok))
+            share[(t // 12, tok)] += 1
+        fixed_group = {t: g for g, t in self.fixed_team.items()}
+        unfixed = [g for g in range(len(GROUPS)) if g not in self.fixed_team]
+
+        team_group = np.zeros((n_teams, len(GROUPS)))
+        pair = np.zeros((n_teams, n_teams))
+        if histories is None:
+            histories = self.histories()
+        for hist, n_groups in histories.items():
+            # histories starting with a fixed team belong to that team's group
+            groups = [fixed_group[~hist[0]]] if hist[0] < 0 else unfixed
+            tokens = set(enumerate(hist))
+            here = [t for t in range(n_teams) if team_token[t] in tokens]
+            for a in here:
+                team_group[a, groups] += n_groups / len(groups) / share[team_token[a]]
+                for b in here:
+                    # a group holds one team per pot
+                    if a // 12 != b // 12:
+                        pair[a, b] += n_groups / (share[team_token[a]] * share[team_token[b]])
+        return DrawProbabilities(list(engine.teams), team_group, pair)
+
+
+class _PotChain:
+    """Process states of one pot, packed into integers and stepped a layer at a time.
+
+    A state is the number of open groups per mask and of teams left per
+    block.  `moves(states)` follows `assign_pot_with_rules` for a whole
+    array of states at once: dead ends have no moves, a team with a single
+    possible group is placed first, otherwise a random team goes to a
+    random allowed group.
+    """
+
+    def __init__(self, masks, sizes, totals):
+        self.totals = tuple(totals)
+        # cells: the (mask, block) pairs a move can use
+        self.cells = [(i, j) for j in range(len(totals))
+                      for i, m in enumerate(masks) if m >> j & 1]
+        self.n_masks = len(masks)
+        self.radix = np.array([n + 1 for n in list(sizes) + list(totals)])
+        self.weight = np.cumprod(np.concatenate([[1], self.radix[:-1]]))
+        self.start = int(self.weight @ (self.radix - 1))
+        # accepts[j, i]: mask i accepts block j
+        self.accepts = np.array([[m >> j & 1 for m in masks] for j in range(len(totals))])
+        self.cell_mask = np.array([i for i, _ in self.cells], dtype=np.intp)
+        self.cell_block = np.array([j for _, j in self.cells], dtype=np.intp)
+        # a move of cell (i, j) closes one group of mask i and uses one team of block j
+        self.cell_step = self.weight[self.cell_mask] + self.weight[self.n_masks + self.cell_block]
+
+    def moves(self, states):
+        """Return the possible moves from `states` as flat arrays.
+
+        Each move is ``(cell, source state index, probability, target
+        state)``, `cell` indexing ``self.cells``.
+        """
+        digits = states // self.weight[:, None] % self.radix[:, None]
+        open_ = digits[:self.n_masks]
+        left = digits[self.n_masks:]
+        waiting = left > 0
+        allowed = self.accepts @ open_
+        dead = (waiting & (allowed == 0)).any(axis=0)
+        single = waiting & (allowed == 1)
+        has_forced = single.any(axis=0)
+        forced = single.argmax(axis=0)
+
+        open_i = open_[self.cell_mask]
+        j = self.cell_block
+        q = np.where(has_forced, (forced == j[:, None]) & (open_i > 0),
+                     left[j] / np.maximum(left.sum(axis=0), 1)
+                     * open_i / np.maximum(allowed[j], 1))
+        q[:, dead] = 0
+        src, cell = np.nonzero(q.T)
+        return cell, src, q[cell, src], states[src] - self.cell_step[cell]
+
+
+def _compositions(total, caps):
+    """Yield tuples of len(caps) non-negative ints summing to `total`, bounded by `caps`."""
+    if not caps:
+        if not total:
+            yield ()
+        return
+    for x in range(min(total, caps[0]) + 1):
+        for rest in _compositions(total - x, caps[1:]):
+            yield (x,) + rest
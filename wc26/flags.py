@@ -0,0 +1,117 @@
+"""Team -> flag image manifest.
+
+Resolving a flag means probing `data/flags` for several file names and,
+failing that, asking pycountry for the ISO code, which is far too slow to
+do per rendered cell.  `build_manifest` does it once for every qualified
+team and `load_manifest` keeps the result in `data/flag_manifest.json`,
+rebuilding only when the flags directory listing or `qualified.csv`
+changes.  Teams without a flag (placeholders) are simply absent.
+"""
+import base64
+import json
+import mimetypes
+import os
+
+from .data import DATA_DIR, QUALIFIED_CSV, content_digest, load_qualified
+
+FLAGS_DIR = os.path.join(DATA_DIR, 'flags')
+MANIFEST_JSON = os.path.join(DATA_DIR, 'flag_manifest.json')
+EXTENSIONS = ('.png', '.jpg', '.svg')
+
+# names pycountry does not resolve (or resolves wrongly), as ISO 3166 alpha-2
+OVERRIDES = {
+    'United States': 'US',
+    'South Korea': 'KR',
+    'North Korea': 'KP',
+    'Côte d\'Ivoire': 'CI',
+    'Ivory Coast': 'CI',
+    'DR Congo': 'CD',
+    'Republic of Ireland': 'IE',
+    'USA': 'US',
+}
+
+
+def file_stem(team):
+    """File name stem used for flags saved under the team's own name."""
+    return team.lower().replace(' ', '_').replace("'", '').replace('.', '')
+
+
+def name_to_alpha2(name):
+    """Lower-case ISO alpha-2 code for `name`, or None (pycountry is optional)."""
+    if name in OVERRIDES:
+        return OVERRIDES[name].lower()
+    try:
+        import pycountry
+    except ImportError:
+        return None
+    try:
+        return pycountry.countries.lookup(name).alpha_2.lower()
+    except LookupError:
+        pass
+    try:
+        res = pycountry.countries.search_fuzzy(name)
+    except LookupError:
+        return None
+    return res[0].alpha_2.lower() if res else None
+
+
+def _flag_files(flags_dir):
+    # only the images: download temp files and size subdirectories are not flags
+    if not os.path.isdir(flags_dir):
+        return []
+    return sorted(f for f in os.listdir(flags_dir)
+                  if f.lower().endswith(EXTENSIONS) and os.path.isfile(os.path.join(flags_dir, f)))
+
+
+def _signature(flags_dir, qualified_path):
+    return {'files': _flag_files(flags_dir), 'qualified': content_digest(qualified_path)}
+
+
+def build_manifest(teams, flags_dir=FLAGS_DIR):
+    """``{team: file name in flags_dir}`` for every team that has a flag."""
+    available = set(_flag_files(flags_dir))
+    manifest = {}
+    for team in teams:
+        stems = [file_stem(team)]
+        alpha2 = name_to_alpha2(team.split('(')[0].strip())
+        if alpha2:
+            stems.append(alpha2)
+        found = next((s + ext for s in stems for ext in EXTENSIONS if s + ext in available), None)
+        if found:
+            manifest[team] = found
+    return manifest
+
+
+def load_manifest(path=MANIFEST_JSON, flags_dir=FLAGS_DIR, qualified_path=QUALIFIED_CSV):
+    """``{team: absolute flag path}``, rebuilding the manifest file if it is stale."""
+    signature = _signature(flags_dir, qualified_path)
+    stored = None
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = None
+    if not stored or stored.get('signature') != signature:
+        teams, _ = load_qualified(qualified_path)
+        stored = {'signature': signature, 'flags': build_manifest(teams, flags_dir)}
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, indent=1, ensure_ascii=False, sort_keys=True)
+        except OSError:
+            pass  # read-only checkout: use the fresh manifest without saving it
+    return {team: os.path.join(flags_dir, name) for team, name in stored['flags'].items()}
+
+
+def data_uris(manifest):
+    """``{team: data: URI}`` of the flag files in `manifest`, for inlining into HTML."""
+    out = {}
+    for team, path in manifest.items():
+        try:
+            with open(path, 'rb') as f:
+                payload = base64.b64encode(f.read()).decode('ascii')
+        except OSError:
+            continue
+        mime = mimetypes.guess_type(path)[0] or 'image/png'
+        out[team] = f'data:{mime};base64,{payload}'
+    return out
@@ -0,0 +1,149 @@
+"""Vectorised group stage.
+
+The 72 group matches come from the ``A1``..``L4`` slot templates in
+`schedule.csv`; slot ``X k`` is the team drawn from pot ``k`` into group
+``X``, i.e. ``draws[:, group, k - 1]`` of a `DrawEngine` batch.  All
+matches of N tournaments are played at once through a `MatchModel`, and
+standings are ranked with one sort key per team built from, in order:
+
+    points
+    head-to-head points, goal difference and goals among teams level on points
+    goal difference, goals scored
+    FIFA ranking (standing in for fair play and drawing of lots)
+
+Head-to-head is applied once over the whole set of teams level on points;
+it is not re-applied to the subset still level afterwards.
+"""
+import re
+
+import numpy as np
+
+from .data import GROUPS, load_schedule
+
+_SLOT = re.compile(r'^([A-L])([1-4])$')
+_PAIRS = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+
+
+def group_matches(schedule):
+    """``(match, group, home_pos, away_pos)`` for every group match in `schedule`."""
+    out = []
+    for row in schedule:
+        home, away = _SLOT.match(row['home'].strip()), _SLOT.match(row['away'].strip())
+        if not home or not away:
+            continue
+        if home.group(1) != away.group(1):
+            raise ValueError(f"Match {row['match']} pairs slots of different groups.")
+        out.append((int(row['match']), GROUPS.index(home.group(1)),
+                    int(home.group(2)) - 1, int(away.group(2)) - 1))
+    return out
+
+
+class GroupResults:
+    """Finishing order of every group, ``(n, groups, 4)`` arrays by position 1st..4th.
+
+    order    team index
+    points   points
+    gd       goal difference
+    gf       goals scored
+    """
+
+    def __init__(self, order, points, gd, gf):
+        self.order = order
+        self.points = points
+        self.gd = gd
+        self.gf = gf
+
+    def __len__(self):
+        return len(self.order)
+
+    def thirds(self):
+        """``(team, points, gd, gf)`` of the third-placed team of each group."""
+        return self.order[:, :, 2], self.points[:, :, 2], self.gd[:, :, 2], self.gf[:, :, 2]
+
+
+class GroupStage:
+    """Group matches of the schedule, compiled for a `MatchModel`."""
+
+    def __init__(self, model, schedule=None):
+        self.model = model
+        matches = group_matches(load_schedule() if schedule is None else schedule)
+        self.matches = np.array([m for m, _, _, _ in matches], dtype=np.int16)
+        self.group = np.array([g for _, g, _, _ in matches], dtype=np.intp)
+        self.home = np.array([h for _, _, h, _ in matches], dtype=np.intp)
+        self.away = np.array([a for _, _, _, a in matches], dtype=np.intp)
+        for g in range(len(GROUPS)):
+            pairs = sorted(tuple(sorted(p)) for p in zip(self.home[self.group == g],
+                                                         self.away[self.group == g]))
+            if pairs != _PAIRS:
+                raise ValueError(f'Group {GROUPS[g]} does not have one match per pair of slots.')
+        self.rank_key = model.rank_key
+
+    def play(self, draws, rng, forced=None):
+        """Goals of every group match: ``(n, matches)`` arrays (home, away).
+
+        `forced` optionally maps a match index to the 90-minute result the
+        home side must get (1 win, 0 draw, -1 loss; scalar or per row);
+        those matches are re-sampled until every row has that result.
+        """
+        teams = draws.astype(np.intp)
+        home = teams[:, self.group, self.home]
+        away = teams[:, self.group, self.away]
+        home_goals, away_goals = self.model.play(home, away, rng)
+        for k, result in (forced or {}).items():
+            result = np.broadcast_to(result, home_goals.shape[:1])
+            todo = np.nonzero(np.sign(home_goals[:, k] - away_goals[:, k]) != result)[0]
+            while todo.size:
+                h, a = self.model.play(home[todo, k], away[todo, k], rng)
+                home_goals[todo, k], away_goals[todo, k] = h, a
+                todo = todo[np.sign(h - a) != result[todo]]
+        return home_goals, away_goals
+
+    def simulate(self, draws, rng, forced=None):
+        """Play and rank all groups of an ``(n, groups, 4)`` draw batch (see `play`)."""
+        home_goals, away_goals = self.play(draws, rng, forced)
+        return self.standings(draws, home_goals, away_goals)
+
+    def standings(self, draws, home_goals, away_goals, groups=None):
+        """Rank groups from the goals of every match (same layout as `play`).
+
+        With `groups` (a list of group indices) only those groups are
+        ranked, and the result arrays cover just them, in that order.
+        """
+        if groups is not None:
+            draws = draws[:, groups]
+            local = np.full(len(GROUPS), -1, dtype=np.intp)
+            local[groups] = np.arange(len(groups))
+            keep = local[self.group] >= 0
+            match_group = local[self.group][keep]
+            match_home, match_away = self.home[keep], self.away[keep]
+            home_goals, away_goals = home_goals[:, keep], away_goals[:, keep]
+        else:
+            match_group, match_home, match_away = self.group, self.home, self.away
+        n, n_groups, size = draws.shape
+        # scored[n, g, i, j]: goals of position i against position j
+        scored = np.zeros((n, n_groups, size, size), dtype=np.int16)
+        scored[:, match_group, match_home, match_away] = home_goals
+        scored[:, match_group, match_away, match_home] = away_goals
+        conceded = scored.swapaxes(2, 3)
+        played = ~np.eye(size, dtype=bool)
+        result_pts = np.where(scored > conceded, 3, np.where(scored == conceded, 1, 0)) * played
+
+        points = result_pts.sum(axis=3)
+        gf = scored.sum(axis=3)
+        gd = gf - conceded.sum(axis=3)
+        level = (points[..., :, None] == points[..., None, :]) & played
+        h2h_pts = (result_pts * level).sum(axis=3)
+        h2h_gf = (scored * level).sum(axis=3)
+        h2h_gd = h2h_gf - (conceded * level).sum(axis=3)
+
+        key = points.astype(np.int64)
+        for field, offset in ((h2h_pts, 0), (h2h_gd, 128), (h2h_gf, 0), (gd, 128), (gf, 0)):
+            key = key * 256 + np.clip(field + offset, 0, 255)
+        key = key * 256 + self.rank_key[draws]
+        order = np.argsort(-key, axis=2, kind='stable')
+
+        def by_order(a):
+            return np.take_along_axis(a, order, axis=2)
+
+        return GroupResults(by_order(draws), by_order(points).astype(np.int8),
+                            by_order(gd).astype(np.int16), by_order(gf).astype(np.int16))
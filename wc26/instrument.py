@@ -0,0 +1,97 @@
+"""Optional hot-path counters and timers.
+
+The draw and tournament code reports retries, rejections and stage times
+here, guarded by ``if instrument.enabled:`` so that while disabled (the
+default) each site costs one attribute check:
+
+    from wc26 import instrument
+    with instrument.collect() as stats:
+        engines.restart.draw()
+    stats.snapshot()   # {'counts': {...}, 'timers': {name: (calls, seconds)}}
+
+A collection only sees the work done by the thread that opened it, so
+concurrent callers (say, two app sessions) each get their own numbers
+and never switch counting on or off for one another.  Counters live in
+the process that does the work: runs spread over worker processes
+(`runner.run`, `JobManager`) only report what ran in this one.
+
+    restart.draws / restarts / failures      `RestartDraw.draw` outer loop
+    restart.pot<k>.attempts / dead_ends / successes / forced / random
+                                             `RestartDraw.assign_pot` per pot
+    engine.rows / restarts / pot<k>.retries  vectorized `DrawEngine` rows redrawn
+    tournament.draw / groups / knockout      stage timers of `Tournament.play`
+"""
+import contextlib
+import threading
+import time
+
+# True while any thread is collecting; the only thing a disabled site reads
+enabled = False
+_lock = threading.Lock()
+_active = {}  # thread id -> Collection
+
+
+class Collection:
+    """Counters and timers of one `collect` block."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.timers = {}
+
+    def count(self, name, k=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + k
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            calls, total = self.timers.get(name, (0, 0.0))
+            self.timers[name] = (calls + 1, total + seconds)
+
+    def snapshot(self):
+        """Copy of the counters and timers collected so far."""
+        with self.lock:
+            return {'counts': dict(sorted(self.counts.items())),
+                    'timers': dict(sorted(self.timers.items()))}
+
+
+@contextlib.contextmanager
+def collect():
+    """Collect the counters of the calling thread for the duration of the block."""
+    global enabled
+    stats = Collection()
+    me = threading.get_ident()
+    with _lock:
+        outer = _active.get(me)
+        _active[me] = stats
+        enabled = True
+    try:
+        yield stats
+    finally:
+        with _lock:
+            if outer is None:
+                del _active[me]
+            else:
+                _active[me] = outer
+            enabled = bool(_active)
+
+
+def count(name, k=1):
+    stats = _active.get(threading.get_ident())
+    if stats is not None:
+        stats.count(name, k)
+
+
+def add_time(name, seconds):
+    stats = _active.get(threading.get_ident())
+    if stats is not None:
+        stats.add_time(name, seconds)
+
+
+def clock():
+    """Start time for `since`; only call it when `enabled`."""
+    return time.perf_counter()
+
+
+def since(name, start):
+    add_time(name, time.perf_counter() - start)
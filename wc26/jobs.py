@@ -0,0 +1,204 @@
+"""Background simulation jobs.
+
+A `JobManager` owns one pool of worker processes that all jobs share.
+`submit` returns a job id straight away; the shards of the job are fed to
+the pool from a coordinator thread and merged in shard order, so the
+result is the same as `runner.run` with the same seed and shard size.
+While it runs, `Job.partial()` gives a snapshot of the merged shards and
+`Job.cancel()` stops it after the shards already in flight.
+
+Meant to be created once per process (e.g. as a Streamlit cached
+resource) so that every session submits to the same pool.
+
+The pool outlives any one job, so the engine and task cannot be handed to
+the workers by a pool initializer.  Instead each job pickles them once to
+a file in the manager's scratch directory, and shards are submitted as
+``(path, size, seed_seq)``; a worker loads each job's file the first time
+it runs one of its shards and keeps the last few it has loaded.
+"""
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import runner
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+WORKER_CACHE = 8  # jobs whose engine a worker process keeps loaded
+
+_loaded = OrderedDict()  # job file -> (task, engine), in each worker process
+
+
+def run_saved_shard(path, size, seed_seq):
+    """Run one shard of the job saved at `path`, loading it once per worker process."""
+    job = _loaded.get(path)
+    if job is None:
+        with open(path, 'rb') as f:
+            job = _loaded[path] = pickle.load(f)
+        while len(_loaded) > WORKER_CACHE:
+            _loaded.popitem(last=False)
+    else:
+        _loaded.move_to_end(path)
+    task, engine = job
+    return runner.run_shard(task, engine, size, seed_seq)
+
+
+class Job:
+    """State of one submitted run; all reads are safe from other threads."""
+
+    def __init__(self, job_id, n):
+        self.id = job_id
+        self.total = n
+        self.done = 0
+        self.status = QUEUED
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._result = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def partial(self):
+        """Snapshot of the shards merged so far (None before the first one)."""
+        with self._lock:
+            return None if self._result is None else self._result.snapshot()
+
+    def _add(self, result, n):
+        with self._lock:
+            if self._result is None:
+                self._result = result
+            else:
+                self._result += result
+            self.done += n
+
+
+class JobManager:
+    """Shared worker pool and registry of jobs.
+
+    With a single worker, shards run in the coordinator thread instead of
+    a process pool.  At most `max_jobs` jobs run at once; more wait in
+    the queue.  Only the last `keep` jobs are remembered.
+    """
+
+    def __init__(self, workers=None, max_jobs=4, keep=100):
+        self.workers = workers or os.cpu_count() or 1
+        self.keep = keep
+        self._pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        self._scratch = tempfile.mkdtemp(prefix='wc26-jobs-') if self._pool is not None else None
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_jobs)
+
+    def submit(self, engine, n, seed=0, task=runner.tally_draws, shard_size=runner.DEFAULT_SHARD_SIZE):
+        """Start `task` over `n` samples in the background and return the job id."""
+        if n <= 0:
+            raise ValueError(f'Need a positive number of samples, not {n}.')
+        with self._lock:
+            job = Job(f'job-{next(self._ids)}', n)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.keep:
+                old = next(iter(self._jobs))
+                if self._jobs[old].active:
+                    break
+                del self._jobs[old]
+        threading.Thread(target=self._run, args=(job, engine, n, seed, task, shard_size),
+                         name=job.id, daemon=True).start()
+        return job.id
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self):
+        for job in self.jobs():
+            job.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            shutil.rmtree(self._scratch, ignore_errors=True)
+
+    def _run(self, job, engine, n, seed, task, shard_size):
+        with self._slots:
+            job.started = time.perf_counter()
+            job.status = RUNNING
+            try:
+                self._shards(job, engine, n, seed, task, shard_size)
+                job.status = CANCELLED if job.done < job.total else DONE
+            except Exception as exc:
+                job.error = exc
+                job.status = FAILED
+            job.finished = time.perf_counter()
+
+    def _shards(self, job, engine, n, seed, task, shard_size):
+        sizes = runner.shard_sizes(n, shard_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        if self._pool is None:
+            for size, ss in zip(sizes, seeds):
+                if job.cancelled:
+                    return
+                job._add(runner.run_shard(task, engine, size, ss), size)
+            return
+        path = os.path.join(self._scratch, job.id + '.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump((task, engine), f, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            self._submit_shards(job, path, sizes, seeds)
+        finally:
+            os.remove(path)
+
+    def _submit_shards(self, job, path, sizes, seeds):
+        # keep a couple of shards per worker in flight so cancelling is quick
+        pending = deque()
+        shards = iter(zip(sizes, seeds))
+        while True:
+            while not job.cancelled and len(pending) < 2 * self.workers:
+                nxt = next(shards, None)
+                if nxt is None:
+                    break
+                size, ss = nxt
+                pending.append((size, self._pool.submit(run_saved_shard, path, size, ss)))
+            if not pending:
+                return
+            size, future = pending.popleft()
+            if job.cancelled:
+                future.cancel()
+                for _, f in pending:
+                    f.cancel()
+                return
+            job._add(future.result(), size)
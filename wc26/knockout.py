@@ -0,0 +1,185 @@
+"""Compiled knockout bracket.
+
+Matches 73-104 of `schedule.csv` name their sides by earlier results:
+``1E``/``2A`` (group winner/runner-up), ``3X`` (a third-placed team, the
+one `ThirdPlaceIndex` allocates to the group winner on the other side),
+``W74`` and ``L101`` (winner/loser of an earlier match).  `Bracket`
+parses these once into integer columns of a per-tournament team table:
+
+    0..11              winner of group g
+    12..23             runner-up of group g
+    24..31             third-placed team meeting third-place column k
+    32 + 2 i, 33 + 2 i winner and loser of the i-th knockout match
+
+so simulating the bracket for N tournaments is a fixed sequence of
+gather, sample and scatter steps over that table.
+"""
+import re
+
+import numpy as np
+
+from .data import GROUPS, load_schedule
+from .groups import group_matches
+from .thirds import ThirdPlaceIndex, advancing_mask
+
+_REF = re.compile(r'^(?:([12])([A-L])|(3X)|([WL])(\d+))$')
+N_GROUPS = len(GROUPS)
+THIRDS_BASE = 2 * N_GROUPS
+
+
+class Bracket:
+    """Knockout matches of the schedule compiled into a DAG over table columns.
+
+    matches[i]     match number of the i-th knockout match (in topological order)
+    source[i]      table columns feeding the two sides of match i
+    stage[i]       index into `stages` of match i
+    final          index of the final
+    """
+
+    def __init__(self, model, schedule=None, thirds=None):
+        self.model = model
+        self.thirds = thirds if thirds is not None else ThirdPlaceIndex.from_csv()
+        schedule = load_schedule() if schedule is None else schedule
+        # group slots like L1 also read as "loser of match 1", so drop group matches first
+        group = {m for m, _, _, _ in group_matches(schedule)}
+        rows = [r for r in schedule if int(r['match']) not in group]
+        self.matches = np.array([int(r['match']) for r in rows], dtype=np.int16)
+        self.knockout_base = THIRDS_BASE + len(self.thirds.winners)
+        self.n_columns = self.knockout_base + 2 * len(rows)
+        self.source = self._compile(rows)
+        self.stage, self.stages, self.final = self._stages()
+
+    def _compile(self, rows):
+        position = {int(r['match']): i for i, r in enumerate(rows)}
+        third_column = {int(w): k for k, w in enumerate(self.thirds.winners)}
+        source = np.zeros((len(rows), 2), dtype=np.intp)
+        used = set()
+        for i, row in enumerate(rows):
+            refs = [_REF.match(row[side].strip()) for side in ('home', 'away')]
+            if not all(refs):
+                raise ValueError(f"Match {row['match']}: cannot read {row['home']!r} v {row['away']!r}.")
+            for side, ref in enumerate(refs):
+                finish, group, third, result, number = ref.groups()
+                if finish:
+                    col = (int(finish) - 1) * N_GROUPS + GROUPS.index(group)
+                elif third:
+                    other = refs[1 - side].groups()
+                    if other[0] != '1' or GROUPS.index(other[1]) not in third_column:
+                        raise ValueError(f"Match {row['match']}: 3X must face a winner listed in the third-place table.")
+                    col = THIRDS_BASE + third_column[GROUPS.index(other[1])]
+                else:
+                    j = position.get(int(number))
+                    if j is None or j >= i:
+                        raise ValueError(f"Match {row['match']} refers to {result}{number}, which is not an earlier knockout match.")
+                    col = self.knockout_base + 2 * j + (result == 'L')
+                if col in used:
+                    raise ValueError(f"Match {row['match']}: {ref.group(0)} is already used by another match.")
+                used.add(col)
+                source[i, side] = col
+        missing = set(range(self.knockout_base)) - used
+        if missing:
+            raise ValueError(f'{len(missing)} group-stage qualifiers are not used by any knockout match.')
+        return source
+
+    def _stages(self):
+        # depth in the DAG; the match fed by losers is the third-place play-off
+        depth = np.zeros(len(self.source), dtype=np.intp)
+        playoff = np.zeros(len(self.source), dtype=bool)
+        for i, cols in enumerate(self.source):
+            earlier = cols[cols >= self.knockout_base] - self.knockout_base
+            if len(earlier):
+                depth[i] = depth[earlier // 2].max() + 1
+                playoff[i] = (earlier % 2).any()
+        n_rounds = int(depth.max()) + 1
+        names = {0: 'Final', 1: 'Semi-finals', 2: 'Quarter-finals'}
+        stages = [names.get(n_rounds - 1 - d, f'Round of {2 ** (n_rounds - d)}')
+                  for d in range(n_rounds)]
+        final = int(np.nonzero((depth == depth.max()) & ~playoff)[0][0])
+        stage = depth.copy()
+        if playoff.any():
+            stage[playoff] = len(stages)
+            stages.append('Third place')
+        return stage, stages, final
+
+    def seed(self, results):
+        """Team table with the group-stage columns filled from `GroupResults`."""
+        n = len(results)
+        table = np.zeros((n, self.n_columns), dtype=np.uint8)
+        table[:, :N_GROUPS] = results.order[:, :, 0]
+        table[:, N_GROUPS:THIRDS_BASE] = results.order[:, :, 1]
+        third_team, points, gd, gf = results.thirds()
+        masks = advancing_mask(points, gd, gf, self.model.rank_key[third_team])
+        groups = self.thirds.allocate(masks)
+        table[:, THIRDS_BASE:self.knockout_base] = np.take_along_axis(third_team, groups.astype(np.intp), axis=1)
+        return table
+
+    def simulate(self, results, rng, forced=None):
+        """Play the bracket after the group stage; returns the filled team table.
+
+        `forced` optionally maps match indices to winners to impose (see `replay`).
+        """
+        return self.play(self.seed(results), rng, forced)
+
+    def play(self, table, rng, forced=None):
+        """Play every knockout match in place on a `seed`-ed table."""
+        forced = forced or {}
+        for i in range(len(self.source)):
+            self._play(table, i, rng, forced.get(i))
+        return table
+
+    def descendants(self, i):
+        """Indices of the matches fed, directly or not, by the result of match `i`."""
+        out = set()
+        frontier = {i}
+        while frontier:
+            cols = {self.knockout_base + 2 * j + k for j in frontier for k in (0, 1)}
+            frontier = {j for j, src in enumerate(self.source) if cols & set(src.tolist())} - out
+            out |= frontier
+        return out
+
+    def replay(self, table, rng, forced, pinned=None):
+        """Re-play in place everything downstream of the matches in `forced`.
+
+        `forced` maps a match index to the winners to impose (a team index,
+        scalar or per row).  Rows where that team is not one of the two
+        sides play the match normally.  Matches that do not depend on a
+        forced one keep the results already in `table`.  `pinned` results
+        are imposed in the same way when re-played, but do not trigger it.
+        """
+        imposed = dict(pinned or {})
+        imposed.update(forced)
+        redo = set(forced)
+        for i in forced:
+            redo |= self.descendants(i)
+        for i in sorted(redo):
+            self._play(table, i, rng, imposed.get(i))
+        return table
+
+    def _play(self, table, i, rng, winner=None):
+        home, away = self.source[i]
+        a = table[:, home].astype(np.intp)
+        b = table[:, away].astype(np.intp)
+        if winner is None:
+            home_through = self.model.knockout(a, b, rng)
+        else:
+            home_through = np.where(a == winner, True,
+                                    np.where(b == winner, False, self.model.knockout(a, b, rng)))
+        table[:, self.knockout_base + 2 * i] = np.where(home_through, a, b)
+        table[:, self.knockout_base + 2 * i + 1] = np.where(home_through, b, a)
+
+    def champion(self, table):
+        return table[:, self.knockout_base + 2 * self.final]
+
+    def reach_counts(self, table, n_teams):
+        """``[team, stage]`` tournaments in which each team played in each stage,
+        plus a last column counting titles (see `columns`)."""
+        counts = np.zeros((n_teams, len(self.stages) + 1), dtype=np.int64)
+        for s in range(len(self.stages)):
+            cols = self.source[self.stage == s].reshape(-1)
+            counts[:, s] = np.bincount(table[:, cols].reshape(-1), minlength=n_teams)
+        counts[:, -1] = np.bincount(self.champion(table), minlength=n_teams)
+        return counts
+
+    @property
+    def columns(self):
+        return self.stages + ['Champion']
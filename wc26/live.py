@@ -0,0 +1,157 @@
+"""Live tournament mode.
+
+Once the real draw is known, `LiveTournament` keeps N simulated
+completions of the tournament in memory and pins real results as they
+come in (by `schedule.csv` match number).  A played match has the same
+result in every sample, so only the matches still to be played stay
+random.  The state is updated incrementally on `refresh()`:
+
+- a group result re-ranks only its own group, then re-plays the bracket
+  of the samples whose knockout qualifiers changed;
+- a knockout result re-plays only the knockout matches downstream of it.
+
+Refresh therefore gets cheaper as the tournament goes on.  Results can be
+fed one by one with `ingest` or from a csv file (``match, home_goals,
+away_goals, winner``) with `ingest_csv`, which only applies new or
+changed rows.
+"""
+import csv
+import os
+
+import numpy as np
+
+from .data import DATA_DIR, GROUPS
+
+RESULTS_CSV = os.path.join(DATA_DIR, 'results.csv')
+
+
+def load_results(path=RESULTS_CSV):
+    """``{match: (home_goals, away_goals, winner or None)}`` from a results csv."""
+    if not os.path.exists(path):
+        return {}
+    results = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if not row.get('match') or row.get('home_goals', '') == '':
+                continue
+            winner = (row.get('winner') or '').strip() or None
+            results[int(row['match'])] = (int(row['home_goals']), int(row['away_goals']), winner)
+    return results
+
+
+class LiveTournament:
+    """Simulated completions of a tournament with real results pinned.
+
+    `draw` is the real draw, ``{group: [team, ...]}`` in pot order.
+    """
+
+    def __init__(self, tournament, draw, n=100_000, seed=None):
+        self.tournament = tournament.with_draw(tournament.engine.from_groups(draw))
+        self.stage = self.tournament.group_stage
+        self.bracket = self.tournament.bracket
+        self.teams = tournament.engine.teams
+        self.team_index = tournament.engine.team_index
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self._group_match = {int(m): k for k, m in enumerate(self.stage.matches)}
+        self._knockout_match = {int(m): i for i, m in enumerate(self.bracket.matches)}
+
+        self.draws = self.tournament.draws(n, self.rng)
+        self.home_goals, self.away_goals = self.stage.play(self.draws, self.rng)
+        self.results = self.stage.standings(self.draws, self.home_goals, self.away_goals)
+        self.table = self.bracket.simulate(self.results, self.rng)
+        self.played = {}
+        self.winners = {}  # knockout match index -> team index
+        self._dirty_groups = set()
+        self._new_winners = {}
+
+    def ingest(self, match, home_goals, away_goals, winner=None):
+        """Record the result of match number `match`.
+
+        `winner` names the team that went through when a knockout match
+        was level after 120 minutes.  Takes effect on the next `refresh`.
+        """
+        match = int(match)
+        if match in self._group_match:
+            k = self._group_match[match]
+            self.home_goals[:, k] = home_goals
+            self.away_goals[:, k] = away_goals
+            self._dirty_groups.add(int(self.stage.group[k]))
+        elif match in self._knockout_match:
+            i = self._knockout_match[match]
+            home, away = (self.table[:, c] for c in self.bracket.source[i])
+            if not ((home == home[0]).all() and (away == away[0]).all()):
+                raise ValueError(f'The teams of match {match} are not settled by the results so far.')
+            home, away = int(home[0]), int(away[0])
+            if home_goals != away_goals:
+                team = home if home_goals > away_goals else away
+            elif winner is None:
+                raise ValueError(f'Match {match} was level: say which team went through.')
+            else:
+                team = self.team_index[winner]
+                if team not in (home, away):
+                    raise ValueError(f'{winner} did not play match {match}.')
+            self.winners[i] = team
+            self._new_winners[i] = team
+        else:
+            raise ValueError(f'No match number {match} in the schedule.')
+        self.played[match] = (home_goals, away_goals, winner)
+
+    def ingest_csv(self, path=RESULTS_CSV):
+        """Ingest the rows of a results csv that are new or changed; returns their match numbers."""
+        new = [(m, r) for m, r in sorted(load_results(path).items()) if self.played.get(m) != r]
+        for match, (home_goals, away_goals, winner) in new:
+            # knockout teams are only settled once the earlier results are in
+            if match in self._knockout_match:
+                self.refresh()
+            self.ingest(match, home_goals, away_goals, winner)
+        return [m for m, _ in new]
+
+    def refresh(self):
+        """Bring the simulated state up to date with the ingested results."""
+        changed = np.zeros(0, dtype=np.intp)
+        if self._dirty_groups:
+            groups = sorted(self._dirty_groups)
+            part = self.stage.standings(self.draws, self.home_goals, self.away_goals, groups)
+            for name in ('order', 'points', 'gd', 'gf'):
+                getattr(self.results, name)[:, groups] = getattr(part, name)
+            self._dirty_groups.clear()
+            # only samples whose knockout qualifiers changed need a new bracket
+            base = self.bracket.knockout_base
+            seed = self.bracket.seed(self.results)
+            changed = np.nonzero((seed[:, :base] != self.table[:, :base]).any(axis=1))[0]
+            if changed.size:
+                self.table[changed] = self.bracket.play(seed[changed], self.rng, self.winners)
+        if self._new_winners:
+            # the re-played rows already carry every pinned winner
+            rest = np.ones(self.n, dtype=bool)
+            rest[changed] = False
+            if rest.all():
+                self.bracket.replay(self.table, self.rng, self._new_winners, pinned=self.winners)
+            elif rest.any():
+                table = self.table[rest]
+                self.bracket.replay(table, self.rng, self._new_winners, pinned=self.winners)
+                self.table[rest] = table
+        self._new_winners = {}
+
+    @property
+    def remaining(self):
+        """Match numbers not played yet."""
+        return sorted((set(self._group_match) | set(self._knockout_match)) - set(self.played))
+
+    def reach_probabilities(self):
+        """``[team, column]`` probabilities for `Bracket.columns`."""
+        self.refresh()
+        return self.bracket.reach_counts(self.table, len(self.teams)) / self.n
+
+    def finish_probabilities(self):
+        """``[team, position]`` probabilities of each group finishing position."""
+        self.refresh()
+        positions = (self.results.order.astype(np.intp) * 4 + np.arange(4)).reshape(-1)
+        counts = np.bincount(positions, minlength=len(self.teams) * 4).reshape(len(self.teams), 4)
+        return counts / self.n
+
+    def group_of(self, team):
+        """Group letter of `team` in the real draw."""
+        t = self.team_index[team]
+        return GROUPS[int(np.nonzero((self.draws[0] == t).any(axis=1))[0][0])]
@@ -0,0 +1,131 @@
+"""Rankings-driven match outcome model.
+
+Every team gets an Elo-style rating from its position in `rankings.csv`
+(``BASE_RATING - RATING_PER_LOG_RANK * ln(rank)``), and the two sides of a
+match score independent Poisson goals whose means split `MEAN_GOALS`
+according to the rating difference.  All of it is worked out once into
+dense team x team tables, so simulating a match is an array lookup plus a
+vectorised random draw.
+
+Placeholders (``UEFA Path n``, ``IC Winner n``) and teams missing from the
+rankings get `PLACEHOLDER_RANK`; build `MatchModel(teams, ranks)` directly
+to use other ranks.
+"""
+import math
+import os
+
+import numpy as np
+
+from .data import RANKINGS_CSV, load_ranks
+
+BASE_RATING = 2000.0
+RATING_PER_LOG_RANK = 120.0
+MEAN_GOALS = 2.6
+# goal means scale by exp(GOAL_SCALE * rating difference / 400)
+GOAL_SCALE = 0.5
+PLACEHOLDER_RANK = 60
+MAX_GOALS = 12
+# chance of the listed-first team winning a level knockout tie after extra time/penalties
+SHOOTOUT = 0.5
+
+
+class MatchModel:
+    """Precomputed match tables for a fixed list of teams.
+
+    For team indices ``a`` (listed first) and ``b``:
+    ``goals[a, b]`` expected goals of a, ``win[a, b]``/``draw[a, b]``/
+    ``loss[a, b]`` outcome probabilities over 90 minutes, ``advance[a, b]``
+    chance of a going through a knockout tie.
+    """
+
+    def __init__(self, teams, ranks):
+        self.teams = list(teams)
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.ranks = np.array([ranks[t] for t in self.teams], dtype=float)
+        # FIFA ranking as a last tie-breaker, higher is better
+        self.rank_key = 255 - np.clip(self.ranks, 0, 255).astype(np.int64)
+        self.rating = BASE_RATING - RATING_PER_LOG_RANK * np.log(self.ranks)
+
+        diff = (self.rating[:, None] - self.rating[None, :]) / 400.0
+        self.goals = MEAN_GOALS / 2 * np.exp(GOAL_SCALE * diff)
+        # Poisson pmf of both sides, truncated at MAX_GOALS (the tail is negligible)
+        k = np.arange(MAX_GOALS + 1)
+        log_fact = np.array([math.lgamma(i + 1) for i in k])
+        pmf = np.exp(k * np.log(self.goals)[..., None] - self.goals[..., None] - log_fact)
+        # goal cdf as [k, a * teams + b], for inverse-cdf sampling from uniforms
+        cdf = np.cumsum(pmf, axis=2)
+        self._goal_cdf = (cdf / cdf[..., -1:]).reshape(-1, len(k)).T.copy()
+        # joint[a, b, i, j] = P(a scores i) * P(b scores j); b's goals are goals[b, a]
+        joint = pmf[:, :, :, None] * pmf.transpose(1, 0, 2)[:, :, None, :]
+        self.win = (joint * np.tri(len(k), k=-1)).sum(axis=(2, 3))
+        self.draw = np.trace(joint, axis1=2, axis2=3)
+        self.loss = (joint * np.tri(len(k), k=-1).T).sum(axis=(2, 3))
+        # renormalise away the truncated tail
+        total = self.win + self.draw + self.loss
+        self.win /= total
+        self.draw /= total
+        self.loss /= total
+        self._not_loss = self.win + self.draw
+        self.advance = self.win + SHOOTOUT * self.draw
+
+    @classmethod
+    def from_rankings(cls, teams, path=RANKINGS_CSV):
+        """Model for `teams` with ranks read from `path` (cached per file version)."""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        key = (os.path.abspath(path), mtime, tuple(teams))
+        model = _models.get(key)
+        if model is None:
+            rank_of = load_ranks(path)
+            model = cls(teams, {t: rank_of.get(t, PLACEHOLDER_RANK) for t in teams})
+            _models.clear()
+            _models[key] = model
+        return model
+
+    @classmethod
+    def from_snapshot(cls, teams, history, date):
+        """Model for `teams` with the ranks of a `RankingHistory` release in force on `date`."""
+        rank_of = history.ranks(date)
+        return cls(teams, {t: rank_of.get(t, PLACEHOLDER_RANK) for t in teams})
+
+    def play(self, a, b, rng):
+        """Simulate matches between index arrays `a` and `b`; returns (goals_a, goals_b).
+
+        Goals are inverse-cdf transforms of ``rng.random`` uniforms, so any
+        object with a numpy-style ``random(shape)`` works as `rng` (see
+        `wc26.sampling`), and equal uniforms give monotonically related
+        scores across models (common random numbers).
+        """
+        shape = np.broadcast(a, b).shape
+        return self.goals_from(a, b, rng.random(shape)), self.goals_from(b, a, rng.random(shape))
+
+    def goals_from(self, a, b, u):
+        """Goals of `a` against `b` at uniform quantiles `u`."""
+        cell = np.asarray(a) * len(self.teams) + np.asarray(b)
+        goals = np.zeros(u.shape, dtype=np.int16)
+        for k in range(MAX_GOALS):
+            above = u > self._goal_cdf[k][cell]
+            if not above.any():
+                break
+            goals += above
+        return goals
+
+    def outcome(self, a, b, rng):
+        """Sample 90-minute outcomes only: 1 a wins, 0 draw, -1 b wins."""
+        u = rng.random(np.broadcast(a, b).shape)
+        return np.where(u < self.win[a, b], 1, np.where(u < self._not_loss[a, b], 0, -1))
+
+    def knockout(self, a, b, rng):
+        """Sample knockout ties: True where `a` goes through."""
+        return rng.random(np.broadcast(a, b).shape) < self.advance[a, b]
+
+    def probabilities(self, team_a, team_b):
+        """(win, draw, loss) for `team_a` against `team_b` by name."""
+        a, b = self.team_index[team_a], self.team_index[team_b]
+        return float(self.win[a, b]), float(self.draw[a, b]), float(self.loss[a, b])
+
+
+# one model per rankings file version; rebuilt when the file changes
+_models = {}
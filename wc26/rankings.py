@@ -0,0 +1,217 @@
+"""Time series of FIFA ranking releases.
+
+Ranking releases are read in one streaming pass, from pasted text dumps
+(a ``YYYY-MM-DD`` line starts each release, then per team a rank line, the
+team name and optionally its points) or from ``team,rank[,points]`` csv
+files, and kept as one compact store, `data/rankings_history.npz`:
+
+    teams    team names
+    dates    release dates, ascending
+    rank     [team, release] rank, 0 where the team is not ranked
+    points   [team, release] points, NaN where unknown
+
+`RankingHistory.snapshot(date)` finds the release in force on any day with
+a single lookup in a per-day index, so draws and simulations can be run
+against any past ranking:
+
+    history = RankingHistory.load()
+    pots, conf_map = load_pots(as_of='2025-11-19')
+    model = MatchModel.from_snapshot(engine.teams, history, '2025-11-19')
+
+    python -m wc26.rankings ingest dump.txt 2024-12.csv --date 2024-12-19
+    python -m wc26.rankings show --as-of 2025-06-01
+    python -m wc26.rankings export --as-of 2025-11-19 --csv data/rankings.csv
+"""
+import argparse
+import csv
+import os
+import re
+
+import numpy as np
+
+from .data import RANKINGS_HISTORY as HISTORY_NPZ
+
+_DATE = re.compile(r'^#?\s*(\d{4}-\d{2}-\d{2})\s*$')
+_POINTS = re.compile(r'^\d+\.\d+$')
+_NUMBER = re.compile(r'^[+-]?\d+(?:\.\d+)?$')
+
+
+def parse_text(lines, date=None):
+    """Yield ``(date, [(team, rank, points), ...])`` per release in a text dump.
+
+    A release runs until the next date line; `date` names a first release
+    that has no date line of its own.  Of several number lines before a team
+    name (rank movement, then the next rank) the last one is the rank, and
+    a decimal number right after a name is that team's points.
+    """
+    entries = []
+    rank = None
+    named = False  # the last line was a team name, so a decimal is its points
+    for line in lines:
+        s = line.strip()
+        if not s:
+            continue
+        m = _DATE.match(s)
+        if m:
+            if entries:
+                yield date, entries
+            date, entries, rank, named = m.group(1), [], None, False
+        elif s.isdigit():
+            rank, named = int(s), False
+        elif _POINTS.match(s) and named:
+            team, r, _ = entries[-1]
+            entries[-1] = (team, r, float(s))
+            named = False
+        elif _NUMBER.match(s):
+            named = False
+        elif rank is not None:
+            entries.append((s, rank, np.nan))
+            rank, named = None, True
+    if entries:
+        yield date, entries
+
+
+def parse_csv(lines, date):
+    """The single release of a ``team,rank[,points]`` csv, in `parse_text` form."""
+    entries = []
+    for row in csv.DictReader(lines):
+        points = row.get('points') or ''
+        entries.append((row['team'].strip(), int(row['rank']), float(points) if points else np.nan))
+    yield date, entries
+
+
+def read_releases(path, date=None):
+    """Releases in the file at `path` (csv by extension, text otherwise), streamed."""
+    with open(path, newline='', encoding='utf-8') as f:
+        parse = parse_csv if path.lower().endswith('.csv') else parse_text
+        yield from parse(f, date)
+
+
+class RankingHistory:
+    """Ranks and points of every team at every release date."""
+
+    def __init__(self, teams=(), dates=(), rank=None, points=None):
+        self.teams = list(teams)
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        shape = (len(self.teams), len(self.dates))
+        self.rank = np.zeros(shape, dtype=np.int16) if rank is None else rank
+        self.points = np.full(shape, np.nan, dtype=np.float32) if points is None else points
+        # release in force on every day from the first release to the last
+        days = (self.dates - self.dates[0]).astype(np.int64) if len(self.dates) else np.zeros(0, np.int64)
+        self._by_day = np.searchsorted(days, np.arange(days[-1] + 1 if len(days) else 0),
+                                       side='right') - 1
+
+    @classmethod
+    def build(cls, releases, base=None):
+        """History of `base` (if any) plus `releases`; a release replaces one of the same date.
+
+        Each release is reduced to index arrays as it arrives, so a long
+        stream never holds more than one release's text.
+        """
+        teams = list(base.teams) if base is not None else []
+        index = {t: i for i, t in enumerate(teams)}
+        columns = {}
+        if base is not None:
+            for k, d in enumerate(base.dates):
+                ranked = np.nonzero(base.rank[:, k])[0]
+                columns[d] = (ranked, base.rank[ranked, k], base.points[ranked, k])
+        for date, entries in releases:
+            if date is None:
+                raise ValueError('A ranking release has no date: add a date line or pass --date.')
+            idx = np.empty(len(entries), dtype=np.intp)
+            for j, (team, _, _) in enumerate(entries):
+                if team not in index:
+                    index[team] = len(teams)
+                    teams.append(team)
+                idx[j] = index[team]
+            columns[np.datetime64(date, 'D')] = (
+                idx, np.array([r for _, r, _ in entries], dtype=np.int16),
+                np.array([p for _, _, p in entries], dtype=np.float32))
+        dates = sorted(columns)
+        rank = np.zeros((len(teams), len(dates)), dtype=np.int16)
+        points = np.full((len(teams), len(dates)), np.nan, dtype=np.float32)
+        for k, d in enumerate(dates):
+            idx, r, p = columns[d]
+            rank[idx, k] = r
+            points[idx, k] = p
+        return cls(teams, dates, rank, points)
+
+    @classmethod
+    def load(cls, path=HISTORY_NPZ):
+        with np.load(path) as z:
+            return cls(z['teams'].tolist(), z['dates'], z['rank'], z['points'])
+
+    def save(self, path=HISTORY_NPZ):
+        np.savez(path, teams=np.array(self.teams, dtype=str), dates=self.dates,
+                 rank=self.rank, points=self.points)
+
+    def snapshot(self, date):
+        """Column of the release in force on `date` (the latest one on or before it)."""
+        if not len(self.dates):
+            raise KeyError('The ranking history is empty.')
+        day = int((np.datetime64(date, 'D') - self.dates[0]).astype(np.int64))
+        if day < 0:
+            raise KeyError(f'No ranking release on or before {date} (first is {self.dates[0]}).')
+        return int(self._by_day[min(day, len(self._by_day) - 1)])
+
+    def ranks(self, date):
+        """``{team: rank}`` of the release in force on `date`."""
+        col = self.rank[:, self.snapshot(date)]
+        return {self.teams[i]: int(col[i]) for i in np.nonzero(col)[0]}
+
+    def ranked(self, date):
+        """Team names in ranking order on `date`, like `data.load_rankings`."""
+        col = self.rank[:, self.snapshot(date)]
+        ranked = np.nonzero(col)[0]
+        return [self.teams[i] for i in ranked[np.argsort(col[ranked], kind='stable')]]
+
+    def points_on(self, date):
+        """``{team: points}`` on `date`, for teams whose points are known."""
+        k = self.snapshot(date)
+        col = self.points[:, k]
+        return {self.teams[i]: float(col[i]) for i in np.nonzero((self.rank[:, k] > 0) & ~np.isnan(col))[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='FIFA ranking history.')
+    parser.add_argument('--store', default=HISTORY_NPZ)
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='add ranking releases from text dumps or csv files')
+    ingest.add_argument('files', nargs='+')
+    ingest.add_argument('--date', help='date of a release without a date line (and of csv files)')
+    show = commands.add_parser('show', help='list the releases, or one ranking')
+    show.add_argument('--as-of')
+    export = commands.add_parser('export', help='write one snapshot as a team,rank csv')
+    export.add_argument('--as-of', required=True)
+    export.add_argument('--csv', required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        base = RankingHistory.load(args.store) if os.path.exists(args.store) else None
+        releases = (r for path in args.files for r in read_releases(path, args.date))
+        history = RankingHistory.build(releases, base)
+        history.save(args.store)
+        print(f'{len(history.dates)} releases of {len(history.teams)} teams in {args.store}')
+        return
+    history = RankingHistory.load(args.store)
+    if args.command == 'export':
+        ranks = history.ranks(args.as_of)
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(['team', 'rank'])
+            for team in history.ranked(args.as_of):
+                w.writerow([team, ranks[team]])
+        print(f'Wrote {len(ranks)} teams as of {args.as_of} to {args.csv}')
+    elif args.as_of:
+        ranks = history.ranks(args.as_of)
+        print(f'Release of {history.dates[history.snapshot(args.as_of)]}')
+        for team in history.ranked(args.as_of):
+            print(f'{ranks[team]:>4} {team}')
+    else:
+        for k, d in enumerate(history.dates):
+            print(f'{d}  {np.count_nonzero(history.rank[:, k])} teams')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Randomized restart draw (the app's original algorithm).
+
+Pots are filled one at a time with greedy singleton propagation and random
+choices; a pot that runs into a dead end is retried, and a draw whose pot
+cannot be completed at all is restarted from scratch.
+"""
+import random
+
+from . import instrument
+from .data import FIXED_GROUPS, GROUPS
+from .rules import DrawRules
+
+
+class RestartDraw:
+    """Restart draw compiled once for four pots."""
+
+    def __init__(self, pots, conf_map, fixed=FIXED_GROUPS, max_pot_attempts=500, max_restarts=300):
+        self.pots = [list(p) for p in pots]
+        self.fixed = dict(fixed)
+        self.max_pot_attempts = max_pot_attempts
+        self.max_restarts = max_restarts
+        # confederation constraints compiled once: team/confederation indices and per-group counts
+        self.rules = DrawRules([t for p in self.pots for t in p], conf_map, n_groups=len(GROUPS))
+
+    def can_place(self, team, grp, result, state=None):
+        """Return True if `team` may be placed into group `grp` considering current `result`.
+        Pass a `state` built by `rules.state_from` to avoid recounting the groups.
+        """
+        if state is None:
+            state = self.rules.state_from(result, GROUPS)
+        return state.can_place(self.rules.team_index[team], GROUPS.index(grp))
+
+    def assign_pot(self, result, pot, slot_index, rng=random):
+        """Attempt to place all teams from `pot` into `result` at `slot_index` respecting confed rules.
+        Uses greedy singleton propagation and random choices; retries if conflict arises.
+        Returns True on success (mutates result), False otherwise.
+        """
+        rules = self.rules
+        on = instrument.enabled
+        if on:
+            start = instrument.clock()
+            name = f'restart.pot{slot_index + 1}'
+        base_state = rules.state_from(result, GROUPS)
+        pot_teams = [rules.team_index[t] for t in pot]
+        # bitmask of groups whose slot at slot_index is still empty
+        open_slots = 0
+        for g, grp in enumerate(GROUPS):
+            if result[grp][slot_index] is None:
+                open_slots |= 1 << g
+
+        for attempt in range(self.max_pot_attempts):
+            if on:
+                instrument.count(name + '.attempts')
+            # working copy of the group counts for this attempt
+            state = base_state.copy()
+            free = open_slots
+            placed = []
+            pool = pot_teams.copy()
+            rng.shuffle(pool)
+            success = True
+
+            # iterative placement loop with singleton propagation
+            while pool:
+                # possible groups for each team as a bitmask
+                poss = {t: state.allowed(t) & free for t in pool}
+
+                # if any team has zero possibilities, fail this attempt
+                if not all(poss.values()):
+                    success = False
+                    break
+
+                # forced placements (singleton), one at a time so later ones are re-checked
+                forced = [t for t in pool if poss[t] & (poss[t] - 1) == 0]
+                if forced:
+                    t = forced[0]
+                    g = poss[t].bit_length() - 1
+                    if on:
+                        instrument.count(name + '.forced')
+                else:
+                    # otherwise pick a random team and random allowed group
+                    t = rng.choice(pool)
+                    g = rng.choice([g for g in range(len(GROUPS)) if poss[t] >> g & 1])
+                    if on:
+                        instrument.count(name + '.random')
+                state.place(t, g)
+                free &= ~(1 << g)
+                placed.append((t, g))
+                pool.remove(t)
+
+            if success:
+                # commit placements into result
+                for t, g in placed:
+                    result[GROUPS[g]][slot_index] = rules.teams[t]
+                if on:
+                    instrument.count(name + '.successes')
+                    instrument.since(name, start)
+                return True
+            if on:
+                instrument.count(name + '.dead_ends')
+        if on:
+            instrument.since(name, start)
+        return False
+
+    def draw(self, rng=None):
+        """Return one complete draw as ``{group: [team, ...]}``, or None if every restart failed.
+
+        `rng` may be a `random.Random`, a seed or None.
+        """
+        if not isinstance(rng, random.Random):
+            rng = random.Random(rng)
+        on = instrument.enabled
+        if on:
+            instrument.count('restart.draws')
+        for attempt in range(self.max_restarts):
+            if on and attempt:
+                instrument.count('restart.restarts')
+            # start fresh
+            result = {g: [None] * len(self.pots) for g in GROUPS}
+
+            # pot1: place fixed teams then place remaining with rules
+            p1 = self.pots[0].copy()
+            rng.shuffle(p1)
+            for team, grp in self.fixed.items():
+                if team in p1 and grp in GROUPS:
+                    result[grp][0] = team
+                    p1.remove(team)
+
+            # all pots with confed rules (intercontinental placeholders are exempt)
+            if all(self.assign_pot(result, pot, i, rng)
+                   for i, pot in enumerate([p1] + self.pots[1:])):
+                return result
+        if on:
+            instrument.count('restart.failures')
+        return None
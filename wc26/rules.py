@@ -0,0 +1,90 @@
+"""Confederation rules used by the draw."""
+
+
+def team_confederation(team, conf_map):
+    # return confederation code or None; mark intercontinental as special 'INTER'
+    if team in conf_map:
+        return conf_map[team]
+    if isinstance(team, str):
+        if team.startswith('UEFA') or 'UEFA' in team:
+            return 'UEFA'
+        if team.startswith('IC') or 'Intercontinental' in team:
+            return 'INTER'
+    return None
+
+
+def conf_limit(conf):
+    if conf == 'UEFA':
+        return 2
+    # default: one per confederation
+    return 1
+
+
+class DrawRules:
+    """Confederation constraints compiled once for a fixed list of teams.
+
+    Every team gets an integer index and a confederation index; placeholder
+    names (``UEFA Path n``, ``IC Winner n``) are resolved here once, so
+    feasibility checks never look at team names again.
+    """
+
+    def __init__(self, teams, conf_map, n_groups=12):
+        self.teams = list(teams)
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.n_groups = n_groups
+        confs = [team_confederation(t, conf_map) for t in self.teams]
+        self.confederations = sorted(set(confs), key=lambda c: (c is None, c or ''))
+        conf_index = {c: i for i, c in enumerate(self.confederations)}
+        self.team_conf = [conf_index[c] for c in confs]
+        self.conf_limit = [conf_limit(c) for c in self.confederations]
+        # intercontinental placeholders are exempt from the limits
+        self.conf_exempt = [c == 'INTER' for c in self.confederations]
+
+    def new_state(self):
+        return GroupState(self)
+
+    def state_from(self, result, groups):
+        """Build a GroupState from an app-style ``{group: [team or None, ...]}`` dict."""
+        state = self.new_state()
+        for g, grp in enumerate(groups):
+            for t in result.get(grp, []):
+                if t:
+                    state.place(self.team_index[t], g)
+        return state
+
+
+class GroupState:
+    """Per-group confederation counts for a draw in progress.
+
+    `closed[c]` is a bitmask of the groups that have reached the limit for
+    confederation `c`, so a feasibility check is a single bit test and a
+    placement is an O(1) update.
+    """
+
+    __slots__ = ('rules', 'counts', 'closed')
+
+    def __init__(self, rules, counts=None, closed=None):
+        self.rules = rules
+        n_conf = len(rules.confederations)
+        self.counts = counts if counts is not None else [[0] * n_conf for _ in range(rules.n_groups)]
+        self.closed = closed if closed is not None else [0] * n_conf
+
+    def copy(self):
+        return GroupState(self.rules, [list(c) for c in self.counts], list(self.closed))
+
+    def allowed(self, team):
+        """Bitmask of the groups team index `team` may still join."""
+        conf = self.rules.team_conf[team]
+        all_groups = (1 << self.rules.n_groups) - 1
+        if self.rules.conf_exempt[conf]:
+            return all_groups
+        return all_groups & ~self.closed[conf]
+
+    def can_place(self, team, g):
+        return bool(self.allowed(team) >> g & 1)
+
+    def place(self, team, g):
+        conf = self.rules.team_conf[team]
+        self.counts[g][conf] += 1
+        if self.counts[g][conf] >= self.rules.conf_limit[conf] and not self.rules.conf_exempt[conf]:
+            self.closed[conf] |= 1 << g
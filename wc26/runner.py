@@ -0,0 +1,111 @@
+"""Multi-process Monte Carlo runner.
+
+The requested number of draws is cut into fixed-size shards and shard `i`
+always draws from the `i`-th stream spawned from ``SeedSequence(seed)``, so
+the merged result only depends on the seed, the draw count and the shard
+size -- never on how many worker processes ran the shards or in what
+order they finished.
+
+    python -m wc26.runner -n 1000000 --seed 7 --workers 32
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .aggregate import DrawAggregator
+from .data import load_pots
+from .draw import DrawEngine
+
+DEFAULT_SHARD_SIZE = 65536
+
+
+def tally_draws(engine, n, rng):
+    """Default shard task: draw `n` draws and aggregate them batch by batch."""
+    agg = DrawAggregator.for_engine(engine)
+    for start in range(0, n, engine.batch_size):
+        agg.add_draws(engine.draw(min(engine.batch_size, n - start), rng))
+    return agg
+
+
+def shard_sizes(n, shard_size=DEFAULT_SHARD_SIZE):
+    return [min(shard_size, n - start) for start in range(0, n, shard_size)]
+
+
+def run(engine, n, seed=0, workers=None, shard_size=DEFAULT_SHARD_SIZE, task=tally_draws,
+        progress=None):
+    """Run `task(engine, shard_n, rng)` over all shards and merge the results by addition.
+
+    `workers` defaults to the number of CPUs; with 1 worker everything runs
+    in this process.  `task` must be a module-level function so it can be
+    sent to the worker processes.  `progress(total)`, if given, is called
+    with the running total after every merged shard.
+    """
+    if n <= 0:
+        raise ValueError(f'Need a positive number of samples, not {n}.')
+    sizes = shard_sizes(n, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers <= 1:
+        results = (run_shard(task, engine, size, ss) for size, ss in zip(sizes, seeds))
+        return _merge(results, progress)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(engine, task)) as pool:
+        return _merge(pool.map(_run_shard, sizes, seeds), progress)
+
+
+def run_shard(task, engine, size, seed_seq):
+    """Run one shard in this process; module-level so it can be sent to a process pool."""
+    return task(engine, size, np.random.default_rng(seed_seq))
+
+
+def _merge(results, progress):
+    # merged in shard order as they arrive, so the result never depends on scheduling
+    total = None
+    for r in results:
+        if total is None:
+            total = r
+        else:
+            total += r
+        if progress is not None:
+            progress(total)
+    return total
+
+
+_worker_engine = None
+_worker_task = None
+
+
+def _init_worker(engine, task):
+    # the engine is sent once per process instead of once per shard
+    global _worker_engine, _worker_task
+    _worker_engine = engine
+    _worker_task = task
+
+
+def _run_shard(size, seed_seq):
+    return run_shard(_worker_task, _worker_engine, size, seed_seq)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Monte Carlo draw simulation.')
+    parser.add_argument('-n', type=int, default=1_000_000, help='number of draws')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    args = parser.parse_args(argv)
+
+    pots, conf_map = load_pots()
+    engine = DrawEngine(pots, conf_map)
+    start = time.perf_counter()
+    tally = run(engine, args.n, args.seed, args.workers, args.shard_size)
+    elapsed = time.perf_counter() - start
+    print(f'{tally.n} draws in {elapsed:.1f}s ({tally.n / elapsed:,.0f} draws/s)')
+    probs = tally.group_probabilities()
+    for t, team in enumerate(engine.teams):
+        print(f'{team:<16}' + ' '.join(f'{p:.3f}' for p in probs[t]))
+
+
+if __name__ == '__main__':
+    main()
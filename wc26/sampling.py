@@ -0,0 +1,107 @@
+"""Variance reduction and adaptive stopping for tournament Monte Carlo.
+
+Match outcomes are inverse-cdf transforms of uniforms (`MatchModel.play`,
+`MatchModel.knockout`), so the uniforms themselves can be made smarter.
+A sampler wraps a numpy Generator and only changes ``random(shape)``;
+rows (axis 0) are tournaments:
+
+    plain        independent uniforms
+    antithetic   the second half of the rows uses ``1 - u`` of the first
+    stratified   each column is a Latin hypercube: one uniform per 1/n stratum
+
+`BatchStats` keeps the batch-means variance of the count outputs of a
+`TournamentTally` and turns it into confidence-interval half-widths, which
+`tournament.simulate_until` uses to stop once every probability is known
+well enough.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+SAMPLINGS = ('plain', 'antithetic', 'stratified')
+
+
+class Antithetic:
+    """Uniforms in antithetic pairs: row ``i + half`` uses ``1 - u[i]``."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def random(self, size):
+        size = (size,) if np.ndim(size) == 0 else tuple(size)
+        half = (size[0] + 1) // 2
+        u = self.rng.random((half,) + size[1:])
+        return np.concatenate([u, 1.0 - u])[:size[0]]
+
+
+class Stratified:
+    """Uniforms stratified along the rows, independently per column."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def random(self, size):
+        size = (size,) if np.ndim(size) == 0 else tuple(size)
+        n = size[0]
+        flat = (n, int(np.prod(size[1:], dtype=np.int64)))
+        strata = self.rng.random(flat).argsort(axis=0)
+        return ((strata + self.rng.random(flat)) / n).reshape(size)
+
+
+def sampler(sampling, rng):
+    """Uniform source for `sampling` (one of `SAMPLINGS`) drawing from `rng`."""
+    if sampling == 'plain':
+        return rng
+    if sampling == 'antithetic':
+        return Antithetic(rng)
+    if sampling == 'stratified':
+        return Stratified(rng)
+    raise ValueError(f'Unknown sampling: {sampling!r}')
+
+
+class BatchStats:
+    """Batch-means variance of tally counts, for confidence intervals.
+
+    Each `add` is one independent batch (``n`` tournaments and its count
+    arrays); with antithetic or stratified sampling the rows inside a batch
+    are correlated, so the variance has to come from between batches.
+    Only running sums are kept, not the batches.
+    """
+
+    def __init__(self, names=('champion', 'reach', 'finish')):
+        self.names = tuple(names)
+        self.batches = 0
+        self.n = 0
+        self.n2 = 0
+        self.sums = {}
+
+    def add(self, n, counts):
+        self.batches += 1
+        self.n += n
+        self.n2 += n * n
+        for name in self.names:
+            if name not in counts:
+                continue
+            c = counts[name].astype(np.float64)
+            s, s2, sn = self.sums.setdefault(name, [0.0, 0.0, 0.0])
+            self.sums[name] = [s + c, s2 + c * c, sn + c * n]
+
+    def half_widths(self, confidence=0.95):
+        """``{name: half-width array}`` of each probability (inf below two batches)."""
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        out = {}
+        for name, (s, s2, sn) in self.sums.items():
+            if self.batches < 2:
+                out[name] = np.full(np.shape(s), np.inf)
+                continue
+            p = s / self.n
+            # ratio estimator: sum over batches of (c_b - p n_b)^2
+            ss = np.maximum(s2 - 2 * p * sn + p * p * self.n2, 0.0)
+            var = ss * self.batches / (self.batches - 1) / (self.n * self.n)
+            out[name] = z * np.sqrt(var)
+        return out
+
+    def half_width(self, confidence=0.95):
+        """Largest half-width over every tracked probability."""
+        widths = self.half_widths(confidence)
+        return max((float(w.max()) for w in widths.values()), default=np.inf)
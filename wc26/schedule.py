@@ -0,0 +1,125 @@
+"""Schedule compiler.
+
+`data/schedule_source.json` describes the tournament declaratively:
+
+    metros          stadium -> metro area (the ``location`` column)
+    kickoffs        number of matches on a date -> kick-off times in match order
+    times           optional ``{match: time}`` overrides of those rules
+    group_template  the six ``[home, away]`` slot pairs of every group, in order
+    groups          per group, ``[match, date, stadium]`` for each template pair
+    knockouts       ``[match, date, home, away, stadium]`` (``1E``, ``3X``, ``W74``...)
+
+`build` compiles it into `schedule.csv`, which the simulators read.  The
+csv is only rewritten (and so only invalidates the caches keyed on its
+content) when a row really changes.
+
+    python -m wc26.schedule           rebuild if needed and print the changed rows
+    python -m wc26.schedule --check   exit 1 if schedule.csv is out of date
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import defaultdict
+
+from .data import DATA_DIR, GROUPS, SCHEDULE_CSV, load_schedule
+
+SOURCE_JSON = os.path.join(DATA_DIR, 'schedule_source.json')
+FIELDS = ('match', 'home', 'away', 'date', 'time (est)', 'stadium', 'location')
+
+
+def compile_rows(source):
+    """Schedule rows (dicts of `FIELDS`, match order) from a parsed source."""
+    template = source['group_template']
+    metros = source.get('metros', {})
+    rows = []
+    for group in GROUPS:
+        fixtures = source['groups'][group]
+        if len(fixtures) != len(template):
+            raise ValueError(f'Group {group} needs {len(template)} matches, not {len(fixtures)}.')
+        for (home, away), (match, date, stadium) in zip(template, fixtures):
+            rows.append({'match': match, 'home': f'{group}{home}', 'away': f'{group}{away}',
+                         'date': date, 'stadium': stadium})
+    for match, date, home, away, stadium in source['knockouts']:
+        rows.append({'match': match, 'home': home, 'away': away, 'date': date, 'stadium': stadium})
+
+    rows.sort(key=lambda r: r['match'])
+    numbers = [r['match'] for r in rows]
+    if len(set(numbers)) != len(numbers):
+        raise ValueError('Match numbers must be unique.')
+    by_date = defaultdict(list)
+    for row in rows:
+        by_date[row['date']].append(row)
+    overrides = {int(m): t for m, t in source.get('times', {}).items()}
+    for date, day in by_date.items():
+        times = source['kickoffs'].get(str(len(day)))
+        for i, row in enumerate(day):
+            time = overrides.get(row['match'], times[i] if times else None)
+            if time is None:
+                raise ValueError(f"No kick-off rule for {len(day)} matches on {date} (match {row['match']}).")
+            row['time (est)'] = time
+    for row in rows:
+        row['location'] = metros.get(row['stadium'], '')
+        row['match'] = str(row['match'])
+    return [{k: row[k] for k in FIELDS} for row in rows]
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def diff_rows(old, new):
+    """``[(match, field, old value, new value)]``; a whole added/removed row has field None."""
+    old = {int(r['match']): r for r in old}
+    new = {int(r['match']): r for r in new}
+    out = []
+    for m in sorted(set(old) | set(new)):
+        if m not in old or m not in new:
+            out.append((m, None, old.get(m), new.get(m)))
+            continue
+        out.extend((m, f, old[m].get(f, ''), new[m][f]) for f in FIELDS if old[m].get(f, '') != new[m][f])
+    return out
+
+
+def build(source_path=SOURCE_JSON, csv_path=SCHEDULE_CSV, write=True):
+    """Recompile the schedule; returns the changed rows (see `diff_rows`).
+
+    The csv is only written when a row changed (or it is missing); with
+    ``write=False`` nothing is written, which is how ``--check`` works.
+    """
+    with open(source_path, encoding='utf-8') as f:
+        rows = compile_rows(json.load(f))
+    changes = diff_rows(load_schedule(csv_path), rows)
+    if write and (changes or not os.path.exists(csv_path)):
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            f.write(to_csv(rows))
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile data/schedule_source.json into schedule.csv.')
+    parser.add_argument('--source', default=SOURCE_JSON)
+    parser.add_argument('--csv', default=SCHEDULE_CSV)
+    parser.add_argument('--check', action='store_true',
+                        help='only report; exit 1 if the csv differs from the source')
+    args = parser.parse_args(argv)
+
+    changes = build(args.source, args.csv, write=not args.check)
+    for match, field, old, new in changes:
+        if field is None:
+            print(f"{'+' if old is None else '-'} match {match}")
+        else:
+            print(f'  match {match} {field}: {old!r} -> {new!r}')
+    print(f'{len(changes)} change(s)' if changes else 'schedule is up to date')
+    if args.check and changes:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
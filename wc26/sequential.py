@@ -0,0 +1,148 @@
+"""Sequential draw with constraint propagation.
+
+Instead of drawing a pot at random and restarting on a dead end, every ball
+is checked before it is placed: a team only goes to a group if the rest of
+the draw (this pot and all later ones) can still be completed afterwards.
+The draw therefore finishes in a single pass and never fails.
+
+Feasibility only depends on how many teams of each confederation are left
+and on the per-group confederation counts, so it is answered by a memoised
+search over canonical states (sorted group counts, projected onto the
+confederations that are still to come).  The cache lives on the
+`SequentialDraw` object and is shared by all its draws, so the per-draw
+cost drops to a few dictionary lookups once the common states are known.
+
+Note that this is a different random process from the restart loop: the
+restarts condition on success, this mode never needs to.
+"""
+import random
+
+from .data import FIXED_GROUPS, GROUPS
+from .rules import DrawRules
+
+
+class SequentialDraw:
+    """Feasibility-checked ball-by-ball draw compiled once for four pots."""
+
+    def __init__(self, pots, conf_map, fixed=FIXED_GROUPS, max_cache=1_000_000):
+        self.max_cache = max_cache
+        self.pots = [list(p) for p in pots]
+        self.teams = [t for pot in self.pots for t in pot]
+        self.rules = DrawRules(self.teams, conf_map, n_groups=len(GROUPS))
+        self.fixed = [(self.rules.team_index[t], GROUPS.index(g)) for t, g in fixed.items()
+                      if t in self.rules.team_index and g in GROUPS]
+        fixed_teams = {t for t, _ in self.fixed}
+        n_conf = len(self.rules.confederations)
+        # limit per confederation, None when exempt
+        self.limits = [None if ex else lim for lim, ex in zip(self.rules.conf_limit,
+                                                              self.rules.conf_exempt)]
+        # teams still to be drawn from each pot, per confederation
+        self.pot_counts = []
+        for p, pot in enumerate(self.pots):
+            counts = [0] * n_conf
+            for t in range(p * len(GROUPS), (p + 1) * len(GROUPS)):
+                if t not in fixed_teams:
+                    counts[self.rules.team_conf[t]] += 1
+            self.pot_counts.append(tuple(counts))
+        # reach[p][c]: pots from p on that still contain confederation c
+        self.reach = []
+        for p in range(len(self.pots) + 1):
+            self.reach.append(tuple(sum(1 for c in self.pot_counts[p:] if c[conf])
+                                    for conf in range(n_conf)))
+        self._feasible = {}
+
+    def draw(self, rng=None):
+        """Return one complete draw as ``{group: [team, ...]}``.
+
+        `rng` may be a `random.Random`, a seed or None.
+        """
+        if not isinstance(rng, random.Random):
+            rng = random.Random(rng)
+        n_conf = len(self.rules.confederations)
+        counts = [[0] * n_conf for _ in GROUPS]
+        result = {g: [None] * len(self.pots) for g in GROUPS}
+        for p, pot in enumerate(self.pots):
+            remaining = list(self.pot_counts[p])
+            open_ = [True] * len(GROUPS)
+            pool = []
+            for t in range(p * len(GROUPS), (p + 1) * len(GROUPS)):
+                fixed_at = [g for ft, g in self.fixed if ft == t]
+                if fixed_at:
+                    self._place(t, fixed_at[0], p, counts, open_, result)
+                else:
+                    pool.append(t)
+            rng.shuffle(pool)
+            for t in pool:
+                conf = self.rules.team_conf[t]
+                remaining[conf] -= 1
+                options = []
+                for g in range(len(GROUPS)):
+                    if not open_[g] or not self._allows(counts[g], conf):
+                        continue
+                    counts[g][conf] += 1
+                    open_[g] = False
+                    if self.feasible(p, remaining, counts, open_):
+                        options.append(g)
+                    counts[g][conf] -= 1
+                    open_[g] = True
+                if not options:
+                    # only reachable if the pots admit no valid draw at all
+                    raise RuntimeError('No valid draw exists for these pots.')
+                self._place(t, rng.choice(options), p, counts, open_, result)
+        return result
+
+    def feasible(self, p, remaining, counts, open_):
+        """Whether pot `p` (with `remaining` teams per confederation) and all later pots fit."""
+        if len(self._feasible) > self.max_cache:
+            self._feasible.clear()
+        return self._search(p, tuple(remaining), self._key(p, counts, open_))
+
+    def _place(self, t, g, p, counts, open_, result):
+        counts[g][self.rules.team_conf[t]] += 1
+        open_[g] = False
+        result[GROUPS[g]][p] = self.teams[t]
+
+    def _allows(self, group_counts, conf):
+        lim = self.limits[conf]
+        return lim is None or group_counts[conf] < lim
+
+    def _key(self, p, counts, open_):
+        # groups are interchangeable: keep sorted (open, counts), with every
+        # count that can no longer reach its limit reset to 0
+        key = []
+        for c, o in zip(counts, open_):
+            reach = self.reach[p] if o else self.reach[p + 1]
+            key.append((o,) + tuple(n if lim is not None and n + r > lim else 0
+                                    for n, r, lim in zip(c, reach, self.limits)))
+        return tuple(sorted(key))
+
+    def _search(self, p, remaining, groups):
+        memo_key = (p, remaining, groups)
+        cached = self._feasible.get(memo_key)
+        if cached is not None:
+            return cached
+        conf = next((c for c, n in enumerate(remaining) if n), None)
+        if conf is None:
+            if p + 1 == len(self.pots):
+                ok = True
+            else:
+                counts = [list(g[1:]) for g in groups]
+                ok = self._search(p + 1, self.pot_counts[p + 1],
+                                  self._key(p + 1, counts, [True] * len(groups)))
+        else:
+            # place one team of `conf` in every distinct kind of open group
+            ok = False
+            left = remaining[:conf] + (remaining[conf] - 1,) + remaining[conf + 1:]
+            for i, g in enumerate(groups):
+                if not g[0] or (i and g == groups[i - 1]) or not self._allows(g[1:], conf):
+                    continue
+                counts = [list(h[1:]) for h in groups]
+                open_ = [h[0] for h in groups]
+                counts[i][conf] += 1
+                open_[i] = False
+                if self._search(p, left, self._key(p, counts, open_)):
+                    ok = True
+                    break
+        self._feasible[memo_key] = ok
+        return ok
+
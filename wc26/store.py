@@ -0,0 +1,322 @@
+"""Columnar on-disk store of simulated tournaments.
+
+A store is a directory with a JSON header and one fixed-width uint8 file
+per column, each holding one row per tournament:
+
+    draw.u8      (n, 12, 4)  team drawn into each group slot
+    finish.u8    (n, 12, 4)  teams of each group in finishing order
+    thirds.u8    (n, 8)      third-placed team meeting each third-place column
+    winners.u8   (n, 32)     winner of each knockout match, in bracket order
+
+The header records the team list, digests of the input csv files, the seed
+and the engine version.  Queries memory-map the columns and scan them in
+chunks, so a store much larger than RAM can be queried:
+
+    store = TournamentStore('runs/2026')
+    store.probability(store.champion('Brazil'), given=store.same_group('Brazil', 'France'))
+    store.distribution(store.opponent('England', 'Round of 32'))
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import __version__, runner
+from .data import (GROUPS, QUALIFIED_CSV, RANKINGS_CSV, SCHEDULE_CSV, THIRD_PLACE_CSV,
+                   content_digest)
+from .knockout import THIRDS_BASE, Bracket
+
+HEADER_JSON = 'header.json'
+STORE_FORMAT = 1
+DEFAULT_CHUNK = 1 << 18
+NO_TEAM = 255
+
+
+def _columns(n_thirds, n_matches):
+    return {
+        'draw': (len(GROUPS), 4),
+        'finish': (len(GROUPS), 4),
+        'thirds': (n_thirds,),
+        'winners': (n_matches,),
+    }
+
+
+def input_digests():
+    """Digests of the input csv files a store depends on, as recorded in its header."""
+    return {
+        'rankings': content_digest(RANKINGS_CSV),
+        'qualified': content_digest(QUALIFIED_CSV),
+        'schedule': content_digest(SCHEDULE_CSV),
+        'third_place': content_digest(THIRD_PLACE_CSV),
+    }
+
+
+def simulate_columns(tournament, n, rng):
+    """Shard task: `n` tournaments as a dict of uint8 column arrays."""
+    out = {name: [] for name in _columns(0, 0)}
+    for start in range(0, n, tournament.batch_size):
+        batch = tournament.play(min(tournament.batch_size, n - start), rng)
+        for name, col in columns_of(tournament.bracket, *batch).items():
+            out[name].append(col)
+    return {name: np.concatenate(parts) for name, parts in out.items()}
+
+
+def record(tournament, path, n, seed=0, workers=1, shard_size=runner.DEFAULT_SHARD_SIZE):
+    """Simulate `n` tournaments into a new store at `path` and return it opened.
+
+    Shards use the same seed streams as `runner.run`, and are written in
+    shard order whatever the number of workers.
+    """
+    os.makedirs(path, exist_ok=True)
+    bracket = tournament.bracket
+    shapes = _columns(len(bracket.thirds.winners), len(bracket.source))
+    sizes = runner.shard_sizes(n, shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    files = {name: open(os.path.join(path, name + '.u8'), 'wb') for name in shapes}
+    try:
+        if workers and workers > 1:
+            with ProcessPoolExecutor(workers, initializer=runner._init_worker,
+                                     initargs=(tournament, simulate_columns)) as pool:
+                _write(files, pool.map(runner._run_shard, sizes, seeds))
+        else:
+            _write(files, (runner.run_shard(simulate_columns, tournament, size, ss)
+                           for size, ss in zip(sizes, seeds)))
+    finally:
+        for f in files.values():
+            f.close()
+    header = {
+        'format': STORE_FORMAT,
+        'engine_version': __version__,
+        'n': n,
+        'seed': seed,
+        'shard_size': shard_size,
+        'teams': tournament.engine.teams,
+        'groups': GROUPS,
+        'matches': [int(m) for m in bracket.matches],
+        'columns': {name: list(shape) for name, shape in shapes.items()},
+        'inputs': input_digests(),
+    }
+    with open(os.path.join(path, HEADER_JSON), 'w', encoding='utf-8') as f:
+        json.dump(header, f, indent=1, ensure_ascii=False)
+    return TournamentStore(path)
+
+
+def _write(files, shards):
+    for columns in shards:
+        for name, f in files.items():
+            columns[name].tofile(f)
+
+
+class Event:
+    """Boolean condition over tournaments; combine with ``&``, ``|`` and ``~``."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, chunk):
+        return self.fn(chunk)
+
+    def __and__(self, other):
+        return Event(lambda c: self(c) & other(c))
+
+    def __or__(self, other):
+        return Event(lambda c: self(c) | other(c))
+
+    def __invert__(self):
+        return Event(lambda c: ~self(c))
+
+
+class Chunk:
+    """Rows ``start:stop`` of a store; derived arrays are computed on first use."""
+
+    def __init__(self, store, start, stop):
+        self.store = store
+        self.start = start
+        self.stop = stop
+        self._table = None
+        self._group_of = None
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def column(self, name):
+        return self.store.columns[name][self.start:self.stop]
+
+    def select(self, mask):
+        """The rows where `mask` is True, copied into an `ArrayChunk`."""
+        return ArrayChunk(self.store, {name: self.column(name)[mask] for name in self.store.columns})
+
+    @property
+    def group_of(self):
+        """``(n, teams)`` group index of every team."""
+        if self._group_of is None:
+            draw = self.column('draw').reshape(len(self), -1).astype(np.intp)
+            out = np.empty((len(self), len(self.store.teams)), dtype=np.uint8)
+            np.put_along_axis(out, draw, np.repeat(np.arange(len(GROUPS), dtype=np.uint8), 4)[None], axis=1)
+            self._group_of = out
+        return self._group_of
+
+    @property
+    def table(self):
+        """Bracket team table (see `wc26.knockout`) rebuilt from the stored columns."""
+        if self._table is None:
+            bracket = self.store.bracket
+            finish = self.column('finish')
+            table = np.empty((len(self), bracket.n_columns), dtype=np.uint8)
+            table[:, :len(GROUPS)] = finish[:, :, 0]
+            table[:, len(GROUPS):THIRDS_BASE] = finish[:, :, 1]
+            table[:, THIRDS_BASE:bracket.knockout_base] = self.column('thirds')
+            winners = self.column('winners')
+            for i, (home, away) in enumerate(bracket.source):
+                a, b, w = table[:, home], table[:, away], winners[:, i]
+                table[:, bracket.knockout_base + 2 * i] = w
+                table[:, bracket.knockout_base + 2 * i + 1] = np.where(w == a, b, a)
+            self._table = table
+        return self._table
+
+
+class ArrayChunk(Chunk):
+    """Tournaments held in memory as a dict of columns, queried like stored rows."""
+
+    def __init__(self, store, columns):
+        n = len(columns['draw'])
+        super().__init__(store, 0, n)
+        self.columns = columns
+
+    def column(self, name):
+        return self.columns[name]
+
+
+def columns_of(bracket, draws, results, table):
+    """Store columns of simulated tournaments (as from `Tournament.play`)."""
+    return {
+        'draw': np.ascontiguousarray(draws, dtype=np.uint8),
+        'finish': results.order.astype(np.uint8),
+        'thirds': table[:, THIRDS_BASE:bracket.knockout_base],
+        'winners': table[:, bracket.knockout_base::2],
+    }
+
+
+class TournamentStore:
+    """Read-only, memory-mapped view of a store written by `record`.
+
+    A store whose input files have changed since it was written is refused,
+    since its columns (the knockout ones in particular) would be read against
+    the wrong schedule; ``check_inputs=False`` opens it anyway.
+    """
+
+    def __init__(self, path, check_inputs=True):
+        self.path = path
+        with open(os.path.join(path, HEADER_JSON), encoding='utf-8') as f:
+            self.header = json.load(f)
+        if self.header.get('format') != STORE_FORMAT:
+            raise ValueError(f"Unsupported store format {self.header.get('format')!r}.")
+        if check_inputs:
+            recorded = self.header.get('inputs', {})
+            stale = sorted(k for k, v in input_digests().items() if recorded.get(k) != v)
+            if stale:
+                raise ValueError(f"Store {path!r} was written from other inputs ({', '.join(stale)}); "
+                                 'pass check_inputs=False to open it anyway.')
+        self.n = self.header['n']
+        self.teams = self.header['teams']
+        self.team_index = {t: i for i, t in enumerate(self.teams)}
+        self.columns = {}
+        for name, shape in self.header['columns'].items():
+            file = os.path.join(path, name + '.u8')
+            self.columns[name] = (np.memmap(file, dtype=np.uint8, mode='r', shape=(self.n, *shape))
+                                  if self.n else np.zeros((0, *shape), dtype=np.uint8))
+        self.bracket = Bracket(None)
+        if [int(m) for m in self.bracket.matches] != self.header['matches']:
+            raise ValueError('The schedule bracket does not match the one the store was written with.')
+
+    def __len__(self):
+        return self.n
+
+    def chunks(self, size=DEFAULT_CHUNK):
+        for start in range(0, self.n, size):
+            yield Chunk(self, start, min(self.n, start + size))
+
+    def _team(self, team):
+        return self.team_index[team] if isinstance(team, str) else int(team)
+
+    # events
+
+    def champion(self, team):
+        t = self._team(team)
+        return Event(lambda c: c.table[:, c.store.bracket.knockout_base + 2 * c.store.bracket.final] == t)
+
+    def in_group(self, team, group):
+        t, g = self._team(team), GROUPS.index(group)
+        return Event(lambda c: c.group_of[:, t] == g)
+
+    def same_group(self, a, b):
+        a, b = self._team(a), self._team(b)
+        return Event(lambda c: c.group_of[:, a] == c.group_of[:, b])
+
+    def finished(self, team, position):
+        """`team` finished its group in `position` (1-4)."""
+        t = self._team(team)
+        return Event(lambda c: (c.column('finish')[:, :, position - 1] == t).any(axis=1))
+
+    def reached(self, team, stage):
+        """`team` played a match of `stage` (e.g. ``'Quarter-finals'``)."""
+        t = self._team(team)
+        cols = self.bracket.source[self.bracket.stage == self.bracket.stages.index(stage)].reshape(-1)
+        return Event(lambda c: (c.table[:, cols] == t).any(axis=1))
+
+    # values
+
+    def opponent(self, team, stage):
+        """Value: `team`'s opponent in `stage`, `NO_TEAM` if it did not get there."""
+        t = self._team(team)
+        src = self.bracket.source[self.bracket.stage == self.bracket.stages.index(stage)]
+
+        def value(c):
+            home, away = c.table[:, src[:, 0]], c.table[:, src[:, 1]]
+            out = np.full(len(c), NO_TEAM, dtype=np.uint8)
+            for mine, theirs in ((home, away), (away, home)):
+                row, match = np.nonzero(mine == t)
+                out[row] = theirs[row, match]
+            return out
+        return value
+
+    def group_opponents(self, team):
+        """Value: ``(n, 3)`` teams drawn into `team`'s group."""
+        t = self._team(team)
+
+        def value(c):
+            draw = c.column('draw')
+            g = c.group_of[:, t].astype(np.intp)
+            mates = draw[np.arange(len(c)), g]
+            return mates[mates != t].reshape(len(c), -1)
+        return value
+
+    # queries
+
+    def count(self, event, given=None, chunk=DEFAULT_CHUNK, chunks=None):
+        """(tournaments with `event` and `given`, tournaments with `given`).
+
+        `chunks` queries other tournaments (e.g. `ArrayChunk`s) instead of the store's.
+        """
+        hits = total = 0
+        for c in self.chunks(chunk) if chunks is None else chunks:
+            mask = given(c) if given is not None else np.ones(len(c), dtype=bool)
+            total += int(mask.sum())
+            hits += int((event(c) & mask).sum())
+        return hits, total
+
+    def probability(self, event, given=None, chunk=DEFAULT_CHUNK, chunks=None):
+        hits, total = self.count(event, given, chunk, chunks)
+        return hits / total if total else float('nan')
+
+    def distribution(self, value, given=None, chunk=DEFAULT_CHUNK, chunks=None):
+        """``{team: probability}`` of a team-valued `value` (e.g. `opponent`), given `given`."""
+        counts = np.zeros(NO_TEAM + 1, dtype=np.int64)
+        total = 0
+        for c in self.chunks(chunk) if chunks is None else chunks:
+            v = value(c)
+            mask = given(c) if given is not None else np.ones(len(c), dtype=bool)
+            total += int(mask.sum())
+            counts += np.bincount(v[mask].reshape(-1), minlength=NO_TEAM + 1)
+        return {self.teams[t]: counts[t] / total for t in np.nonzero(counts[:len(self.teams)])[0]} if total else {}
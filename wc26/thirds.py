@@ -0,0 +1,99 @@
+"""Third-placed teams: which eight advance and whom they meet.
+
+`3rdplace.csv` lists, for each of the C(12, 8) = 495 possible sets of
+advancing third-placed groups, the opponents of the group winners 1A, 1B,
+1D, 1E, 1G, 1I, 1K and 1L.  It is compiled once into a 4096 x 8 uint8
+table indexed by the 12-bit mask of advancing groups (bit g = group g), so
+a whole batch is allocated with one fancy-indexing operation.
+"""
+import csv
+import itertools
+
+import numpy as np
+
+from .data import GROUPS, THIRD_PLACE_CSV
+
+N_ADVANCING = 8
+# marks masks that cannot occur (not exactly eight groups)
+NO_GROUP = 255
+
+
+class ThirdPlaceIndex:
+    """Compiled third-place allocation table.
+
+    winners[k]         group index of the winner in column k (1A, 1B, ...)
+    table[mask, k]     group index of the third-placed team meeting winners[k]
+    """
+
+    def __init__(self, winners, table):
+        self.winners = np.asarray(winners, dtype=np.intp)
+        self.table = table
+
+    @classmethod
+    def from_csv(cls, path=THIRD_PLACE_CSV):
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = list(reader)
+        return cls.compile(header, rows)
+
+    @classmethod
+    def compile(cls, header, rows):
+        """Build and validate the table from the csv header and rows."""
+        winners = []
+        for col in header[1:]:
+            if len(col) != 2 or col[0] != '1' or col[1] not in GROUPS:
+                raise ValueError(f'Unexpected third-place column {col!r}.')
+            winners.append(GROUPS.index(col[1]))
+        if len(winners) != N_ADVANCING:
+            raise ValueError(f'Expected {N_ADVANCING} group winner columns, got {len(winners)}.')
+
+        table = np.full((1 << len(GROUPS), len(winners)), NO_GROUP, dtype=np.uint8)
+        for row in rows:
+            if not row:
+                continue
+            advanced = row[0].split()
+            if (len(advanced) != N_ADVANCING or len(set(advanced)) != N_ADVANCING
+                    or not set(advanced) <= set(GROUPS)):
+                raise ValueError(f'Invalid advancing set {row[0]!r}.')
+            mask = sum(1 << GROUPS.index(g) for g in advanced)
+            if table[mask, 0] != NO_GROUP:
+                raise ValueError(f'Duplicate advancing set {row[0]!r}.')
+            opponents = []
+            for w, cell in zip(winners, row[1:]):
+                cell = cell.strip()
+                if len(cell) != 2 or cell[0] != '3' or cell[1] not in advanced:
+                    raise ValueError(f'Invalid opponent {cell!r} for advancing set {row[0]!r}.')
+                if GROUPS.index(cell[1]) == w:
+                    raise ValueError(f'Group {cell[1]} meets itself for advancing set {row[0]!r}.')
+                opponents.append(GROUPS.index(cell[1]))
+            if len(opponents) != len(winners) or len(set(opponents)) != len(winners):
+                raise ValueError(f'Opponents for {row[0]!r} are not a permutation of the set.')
+            table[mask] = opponents
+
+        missing = [c for c in itertools.combinations(range(len(GROUPS)), N_ADVANCING)
+                   if table[sum(1 << g for g in c), 0] == NO_GROUP]
+        if missing:
+            sets = ', '.join(' '.join(GROUPS[g] for g in c) for c in missing[:3])
+            raise ValueError(f'{len(missing)} advancing sets missing from the table (e.g. {sets}).')
+        return cls(winners, table)
+
+    def allocate(self, masks):
+        """``(n, 8)`` group indices of the thirds meeting `winners`, per mask."""
+        return self.table[masks]
+
+
+def advancing_mask(points, gd, gf, rank_key=None):
+    """12-bit masks of the best eight third-placed groups.
+
+    Arguments are ``(n, groups)`` arrays of the third-placed teams, as from
+    `GroupResults.thirds`; `rank_key` (higher is better) breaks the
+    remaining ties, otherwise the earlier group wins.
+    """
+    key = points.astype(np.int64)
+    for field, offset in ((gd, 128), (gf, 0)):
+        key = key * 256 + np.clip(field.astype(np.int64) + offset, 0, 255)
+    if rank_key is not None:
+        key = key * 256 + rank_key
+    best = np.argsort(-key, axis=1, kind='stable')[:, :N_ADVANCING]
+    return np.bitwise_or.reduce(np.left_shift(1, best), axis=1)
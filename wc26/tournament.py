@@ -0,0 +1,278 @@
+"""End-to-end tournament Monte Carlo: draw, groups, thirds, knockouts.
+
+`Tournament` chains the compiled stages on whole batches; between stages
+everything stays an array of team indices.  A `TournamentTally` keeps only
+the outputs asked for, each a fixed-size count array, so memory does not
+grow with the number of tournaments:
+
+    champion   [team]                titles
+    reach      [team, stage]         tournaments reaching each knockout stage
+    finish     [team, position]      group finishing positions
+    draw       DrawAggregator        draw statistics (random draws only)
+
+Each batch splits its generator into a draw stream and a match stream, so
+two tournaments run with the same seed (say, two match models, or with
+and without a fixed draw) see the same draws and the same match uniforms:
+common random numbers, which make their difference far less noisy than
+either estimate.  `sampling` picks antithetic or stratified match
+uniforms (see `wc26.sampling`), and `simulate_until` keeps adding shards
+until every probability's confidence interval is narrow enough.
+
+    python -m wc26.tournament -n 1000000 --outputs champion reach
+    python -m wc26.tournament --target 0.002 --sampling antithetic
+"""
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+
+from .aggregate import DrawAggregator
+from .data import load_pots
+from .draw import DrawEngine
+from .groups import GroupStage
+from .knockout import Bracket
+from .match import MatchModel
+from .sampling import SAMPLINGS, BatchStats, sampler
+from . import instrument, runner
+
+OUTPUTS = ('champion', 'reach', 'finish', 'draw')
+DEFAULT_OUTPUTS = ('champion', 'reach')
+
+
+class Tournament:
+    """Draw engine, match model, group stage and bracket compiled together.
+
+    With `fixed_draw` (a ``(12, 4)`` array, see `DrawEngine.from_groups`)
+    every tournament starts from that draw instead of a random one.
+    `sampling` is one of `wc26.sampling.SAMPLINGS`; it applies to the
+    match outcomes, the draws are always sampled plainly.
+    """
+
+    def __init__(self, engine, model=None, outputs=DEFAULT_OUTPUTS, fixed_draw=None,
+                 sampling='plain'):
+        unknown = set(outputs) - set(OUTPUTS)
+        if unknown:
+            raise ValueError(f'Unknown outputs: {sorted(unknown)}')
+        if sampling not in SAMPLINGS:
+            raise ValueError(f'Unknown sampling: {sampling!r}')
+        self.engine = engine
+        self.model = model if model is not None else MatchModel.from_rankings(engine.teams)
+        if self.model.teams != engine.teams:
+            raise ValueError('Match model and draw engine must list the teams in the same order.')
+        self.group_stage = GroupStage(self.model)
+        self.bracket = Bracket(self.model)
+        self.outputs = tuple(outputs)
+        self.fixed_draw = None if fixed_draw is None else np.asarray(fixed_draw, dtype=np.uint8)
+        self.sampling = sampling
+
+    def with_draw(self, fixed_draw):
+        """Copy sharing the compiled stages, starting every tournament from `fixed_draw`."""
+        out = copy.copy(self)
+        out.fixed_draw = None if fixed_draw is None else np.asarray(fixed_draw, dtype=np.uint8)
+        return out
+
+    @property
+    def batch_size(self):
+        return self.engine.batch_size
+
+    def draws(self, n, rng):
+        if self.fixed_draw is None:
+            return self.engine.draw(n, rng)
+        return np.broadcast_to(self.fixed_draw, (n,) + self.fixed_draw.shape)
+
+    def play(self, n, rng):
+        """Simulate `n` tournaments: ``(draws, group results, bracket table)``."""
+        on = instrument.enabled
+        if on:
+            start = instrument.clock()
+        draw_rng, match_rng = rng.spawn(2)
+        if self.sampling == 'antithetic' and self.fixed_draw is None:
+            # both tournaments of an antithetic pair start from the same draw
+            half = self.draws((n + 1) // 2, draw_rng)
+            draws = np.concatenate([half, half])[:n]
+        else:
+            draws = self.draws(n, draw_rng)
+        if on:
+            instrument.since('tournament.draw', start)
+            start = instrument.clock()
+        uniforms = sampler(self.sampling, match_rng)
+        results = self.group_stage.simulate(draws, uniforms)
+        if on:
+            instrument.since('tournament.groups', start)
+            start = instrument.clock()
+        table = self.bracket.simulate(results, uniforms)
+        if on:
+            instrument.since('tournament.knockout', start)
+        return draws, results, table
+
+    def tally(self):
+        return TournamentTally(self)
+
+
+class TournamentTally:
+    """Running counts of the selected outputs; merges with ``+``/``+=`` like `DrawAggregator`."""
+
+    def __init__(self, tournament):
+        n_teams = len(tournament.engine.teams)
+        self.outputs = tournament.outputs
+        self.columns = tournament.bracket.columns
+        self.n = 0
+        self.seconds = 0.0
+        self.half_width = None
+        self.counts = {}
+        if 'champion' in self.outputs:
+            self.counts['champion'] = np.zeros(n_teams, dtype=np.int64)
+        if 'reach' in self.outputs:
+            self.counts['reach'] = np.zeros((n_teams, len(self.columns)), dtype=np.int64)
+        if 'finish' in self.outputs:
+            self.counts['finish'] = np.zeros((n_teams, 4), dtype=np.int64)
+        self.draw = DrawAggregator.for_engine(tournament.engine) if 'draw' in self.outputs else None
+
+    def add(self, tournament, draws, results, table):
+        n_teams = len(tournament.engine.teams)
+        self.n += len(draws)
+        if 'champion' in self.counts:
+            self.counts['champion'] += np.bincount(tournament.bracket.champion(table), minlength=n_teams)
+        if 'reach' in self.counts:
+            self.counts['reach'] += tournament.bracket.reach_counts(table, n_teams)
+        if 'finish' in self.counts:
+            positions = (results.order.astype(np.intp) * 4 + np.arange(4)).reshape(-1)
+            self.counts['finish'] += np.bincount(positions, minlength=n_teams * 4).reshape(n_teams, 4)
+        if self.draw is not None and tournament.fixed_draw is None:
+            self.draw.add_draws(draws)
+        return self
+
+    def __iadd__(self, other):
+        self.n += other.n
+        for name, counts in other.counts.items():
+            self.counts[name] += counts
+        if self.draw is not None:
+            self.draw += other.draw
+        return self
+
+    def __add__(self, other):
+        out = self.snapshot()
+        out += other
+        return out
+
+    def snapshot(self):
+        """Independent copy of the current counts."""
+        out = TournamentTally.__new__(TournamentTally)
+        out.outputs = self.outputs
+        out.columns = self.columns
+        out.n = self.n
+        out.seconds = self.seconds
+        out.half_width = self.half_width
+        out.counts = {name: c.copy() for name, c in self.counts.items()}
+        out.draw = None if self.draw is None else self.draw.snapshot()
+        return out
+
+    def rate(self):
+        """Tournaments per second of the run that produced this tally."""
+        return self.n / self.seconds if self.seconds else 0.0
+
+    def probabilities(self, name):
+        return self.counts[name] / max(self.n, 1)
+
+
+def tally_tournaments(tournament, n, rng):
+    """Shard task for `runner.run`: simulate `n` tournaments batch by batch."""
+    tally = tournament.tally()
+    for start in range(0, n, tournament.batch_size):
+        tally.add(tournament, *tournament.play(min(tournament.batch_size, n - start), rng))
+    return tally
+
+
+def simulate(tournament, n, seed=0, workers=None, shard_size=runner.DEFAULT_SHARD_SIZE,
+             progress=None):
+    """Run `n` tournaments across worker processes; the tally records the wall time."""
+    start = time.perf_counter()
+    tally = runner.run(tournament, n, seed, workers, shard_size, task=tally_tournaments,
+                       progress=progress)
+    tally.seconds = time.perf_counter() - start
+    return tally
+
+
+def simulate_until(tournament, target, confidence=0.95, seed=0, workers=None,
+                   shard_size=runner.DEFAULT_SHARD_SIZE, min_shards=8, max_n=10_000_000,
+                   progress=None):
+    """Run shards until every champion/reach/finish probability has a
+    `confidence` interval half-width of at most `target`, or `max_n`
+    tournaments have been played.
+
+    Each shard is one batch for the batch-means variance (`BatchStats`), so
+    antithetic and stratified runs are judged by their real spread.  The
+    tally records the reached ``half_width``.
+    """
+    if not set(tournament.outputs) & {'champion', 'reach', 'finish'}:
+        raise ValueError('Adaptive stopping needs a champion, reach or finish output.')
+    start = time.perf_counter()
+    stats = BatchStats()
+    workers = workers or os.cpu_count() or 1
+    tally = None
+    previous = {}
+
+    def shard_done(total):
+        # runner merges shards into `total` one by one: the difference is the new shard
+        counts = {name: c - previous.get(name, 0) for name, c in total.counts.items()}
+        stats.add(total.n - previous.get('n', 0), counts)
+        previous.update({name: c.copy() for name, c in total.counts.items()}, n=total.n)
+        if progress is not None:
+            progress(total if tally is None else tally + total)
+
+    rounds = 0
+    while True:
+        shards = max(min_shards - stats.batches, workers)
+        n = min(shards * shard_size, max_n - (tally.n if tally is not None else 0))
+        if n <= 0:
+            break
+        previous.clear()
+        part = runner.run(tournament, n, [seed, rounds], workers, shard_size,
+                          task=tally_tournaments, progress=shard_done)
+        tally = part if tally is None else tally + part
+        rounds += 1
+        if stats.half_width(confidence) <= target:
+            break
+    tally.seconds = time.perf_counter() - start
+    tally.half_width = stats.half_width(confidence)
+    return tally
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Monte Carlo tournament simulation.')
+    parser.add_argument('-n', type=int, default=100_000, help='number of tournaments')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-size', type=int, default=runner.DEFAULT_SHARD_SIZE)
+    parser.add_argument('--outputs', nargs='+', choices=OUTPUTS, default=list(DEFAULT_OUTPUTS))
+    parser.add_argument('--sampling', choices=SAMPLINGS, default='plain')
+    parser.add_argument('--target', type=float, default=None,
+                        help='run until every probability has a 95%% half-width below this (-n is the cap)')
+    args = parser.parse_args(argv)
+
+    pots, conf_map = load_pots()
+    engine = DrawEngine(pots, conf_map)
+    tournament = Tournament(engine, outputs=args.outputs, sampling=args.sampling)
+    if args.target is None:
+        tally = simulate(tournament, args.n, args.seed, args.workers, args.shard_size)
+    else:
+        tally = simulate_until(tournament, args.target, seed=args.seed, workers=args.workers,
+                               shard_size=args.shard_size, max_n=args.n)
+    print(f'{tally.n} tournaments in {tally.seconds:.1f}s ({tally.rate():,.0f} tournaments/s)')
+    if args.target is not None:
+        print(f'largest 95% half-width: {tally.half_width:.4f}')
+    if 'reach' in tally.counts:
+        reach = tally.probabilities('reach')
+        print(f"{'':<16}" + ' '.join(f'{c[:8]:>8}' for c in tally.columns))
+        for t in np.argsort(-reach[:, -1]):
+            print(f'{engine.teams[t]:<16}' + ' '.join(f'{p:8.3f}' for p in reach[t]))
+    elif 'champion' in tally.counts:
+        champion = tally.probabilities('champion')
+        for t in np.argsort(-champion):
+            print(f'{engine.teams[t]:<16}{champion[t]:.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""What-if scenarios answered from stored tournaments.
+
+A scenario fixes draw placements (`InGroup`) and/or match results
+(`Result`).  A fixed result is an intervention, not an observation: it is
+imposed on every tournament in which the team plays that match, and
+everything downstream of it is re-played.  The tournaments in which the
+team would have got that result anyway are not preferred, so the
+distribution of how the team got there (its group, its opponents) is the
+unconditioned one.  Concretely:
+
+1. filter: draw placements only condition the draw, so the stored
+   tournaments with that draw are kept as they are;
+2. resimulate: for fixed results, keep the stored draws (and group
+   results, when only knockout matches are fixed) in which the team
+   plays the match, impose the result and re-play only the stages
+   downstream of it in the `schedule.csv` match graph.  Several knockout
+   results are imposed round by round, so winning a match puts the team
+   into the next one it is fixed in.
+
+If the store itself holds too few upstream samples, up to `max_fresh`
+fresh tournaments are simulated to top it up, so rare scenarios are best
+answered from a large store.  Placements the draw rules rule out (a second
+team of one pot in a group, anyone else in a host's slot) are rejected up
+front, and a scenario that no stored or fresh tournament reaches raises
+`ValueError` rather than answering from no samples.
+
+    whatif = WhatIf(TournamentStore('runs/2026'), tournament)
+    s = whatif.scenario(Result(23, 'Argentina', 'loss'))
+    s.probability(store.champion('Argentina'))
+"""
+import numpy as np
+
+from .data import GROUPS
+from .store import ArrayChunk, Event, columns_of
+
+OUTCOMES = {'win': 1, 'draw': 0, 'loss': -1}
+
+
+class InGroup:
+    """`team` is drawn into `group`."""
+
+    def __init__(self, team, group):
+        if group not in GROUPS:
+            raise ValueError(f'Unknown group {group!r}.')
+        self.team = team
+        self.group = group
+
+
+class Result:
+    """`team` gets `outcome` ('win', 'draw' or 'loss') in match number `match`.
+
+    For knockout matches 'win' means going through (after extra time or
+    penalties if need be) and 'draw' is not allowed.
+    """
+
+    def __init__(self, match, team, outcome='win'):
+        if outcome not in OUTCOMES:
+            raise ValueError(f'Unknown outcome {outcome!r}.')
+        self.match = int(match)
+        self.team = team
+        self.outcome = outcome
+
+
+class Scenario:
+    """Tournaments consistent with a scenario; query them like the store."""
+
+    def __init__(self, store, chunks, method):
+        self.store = store
+        self.chunks = chunks
+        self.method = method
+        self.n = sum(len(c) for c in chunks)
+
+    def __len__(self):
+        return self.n
+
+    def probability(self, event, given=None):
+        return self.store.probability(event, given, chunks=self.chunks)
+
+    def distribution(self, value, given=None):
+        return self.store.distribution(value, given, chunks=self.chunks)
+
+
+class WhatIf:
+    """Scenario engine over a `TournamentStore` and the `Tournament` that can extend it."""
+
+    def __init__(self, store, tournament, min_samples=10_000, max_fresh=200_000, seed=None):
+        if store.teams != tournament.engine.teams:
+            raise ValueError('Store and tournament must list the same teams.')
+        self.store = store
+        self.tournament = tournament
+        self.min_samples = min_samples
+        self.max_fresh = max_fresh
+        self.rng = np.random.default_rng(seed)
+        stage = tournament.group_stage
+        self._group_match = {int(m): k for k, m in enumerate(stage.matches)}
+        self._knockout_match = {int(m): i for i, m in enumerate(tournament.bracket.matches)}
+
+    def scenario(self, *conditions):
+        store = self.store
+        # upstream: conditions on the draw alone
+        upstream = Event(lambda c: np.ones(len(c), dtype=bool))
+        group_forced = []  # (match index, team, outcome)
+        knockout_forced = []
+        for cond in conditions:
+            team = store._team(cond.team)
+            if isinstance(cond, InGroup):
+                upstream = upstream & store.in_group(team, cond.group)
+            elif cond.match in self._group_match:
+                k = self._group_match[cond.match]
+                upstream = upstream & self._plays_group_match(k, team)
+                group_forced.append((k, team, OUTCOMES[cond.outcome]))
+            elif cond.match in self._knockout_match:
+                if cond.outcome == 'draw':
+                    raise ValueError(f'Knockout match {cond.match} cannot end in a draw.')
+                knockout_forced.append((self._knockout_match[cond.match], team, OUTCOMES[cond.outcome]))
+            else:
+                raise ValueError(f'No match number {cond.match} in the schedule.')
+        self._check_placements(conditions)
+        # bracket indices are in topological order, so earlier rounds are imposed first
+        knockout_forced.sort(key=lambda f: f[0])
+        forced = bool(group_forced or knockout_forced)
+
+        chunks = self._impose(self._select(store.chunks(), upstream), group_forced, knockout_forced)
+        fresh = 0
+        while sum(len(c) for c in chunks) < self.min_samples and fresh < self.max_fresh:
+            chunks += self._impose(self._fresh(upstream), group_forced, knockout_forced)
+            fresh += self.tournament.batch_size
+        if not chunks:
+            raise ValueError(f'No tournament satisfies the scenario in {len(store)} stored and '
+                             f'{fresh} fresh samples; it is impossible or too rare to answer.')
+        return Scenario(store, chunks, 'resimulate' if forced else 'filter')
+
+    def _check_placements(self, conditions):
+        """Reject draw placements (explicit or implied by a group result) the rules rule out."""
+        engine = self.tournament.engine
+        stage = self.tournament.group_stage
+        fixed = {t: g for pot in engine._fixed for t, g in pot}
+        placed = dict(fixed)
+        for cond in conditions:
+            team = self.store._team(cond.team)
+            if isinstance(cond, InGroup):
+                group = GROUPS.index(cond.group)
+            elif cond.match in self._group_match:
+                group = int(stage.group[self._group_match[cond.match]])
+            else:
+                continue
+            name = engine.teams[team]
+            if team in fixed and fixed[team] != group:
+                raise ValueError(f'{name} is always drawn into group {GROUPS[fixed[team]]}.')
+            if placed.get(team, group) != group:
+                raise ValueError(f'{name} cannot be in both group {GROUPS[placed[team]]} '
+                                 f'and group {GROUPS[group]}.')
+            for other, g in placed.items():
+                if other != team and g == group and other // len(GROUPS) == team // len(GROUPS):
+                    raise ValueError(f'{name} and {engine.teams[other]} are in the same pot, '
+                                     f'so they cannot both be in group {GROUPS[group]}.')
+            placed[team] = group
+
+    def _impose(self, chunks, group_forced, knockout_forced):
+        out = []
+        for chunk in chunks:
+            if group_forced:
+                chunk = self._replay_groups(chunk, group_forced)
+            for i, team, outcome in knockout_forced:
+                # who plays match i depends on the results imposed before it
+                mask = self._plays_knockout_match(i, team)(chunk)
+                if not mask.all():
+                    chunk = chunk.select(mask)
+                if not len(chunk):
+                    break
+                chunk = self._replay_knockout(chunk, i, team, outcome)
+            if len(chunk):
+                out.append(chunk)
+        return out
+
+    def _fresh(self, upstream):
+        # draws are filtered before the (more costly) rest of the tournament is played
+        tournament = self.tournament
+        draws = tournament.draws(tournament.batch_size, self.rng)
+        mask = upstream(ArrayChunk(self.store, {'draw': draws}))
+        if not mask.any():
+            return []
+        draws = draws[mask]
+        results = tournament.group_stage.simulate(draws, self.rng)
+        table = tournament.bracket.simulate(results, self.rng)
+        return [ArrayChunk(self.store, columns_of(tournament.bracket, draws, results, table))]
+
+    def _select(self, chunks, event):
+        out = []
+        for c in chunks:
+            mask = event(c)
+            if mask.any():
+                out.append(c.select(mask))
+        return out
+
+    def _plays_group_match(self, k, team):
+        stage = self.tournament.group_stage
+        g, home, away = stage.group[k], stage.home[k], stage.away[k]
+        return Event(lambda c: (c.column('draw')[:, g, home] == team) | (c.column('draw')[:, g, away] == team))
+
+    def _plays_knockout_match(self, i, team):
+        src = self.tournament.bracket.source[i]
+        return Event(lambda c: (c.table[:, src] == team).any(axis=1))
+
+    def _replay_groups(self, chunk, forced):
+        stage = self.tournament.group_stage
+        draws = chunk.column('draw')
+        results = {}
+        for k, team, outcome in forced:
+            at_home = draws[:, stage.group[k], stage.home[k]] == team
+            results[k] = np.where(at_home, outcome, -outcome)
+        groups = stage.simulate(draws, self.rng, results)
+        table = self.tournament.bracket.simulate(groups, self.rng)
+        return ArrayChunk(self.store, columns_of(self.tournament.bracket, draws, groups, table))
+
+    def _replay_knockout(self, chunk, i, team, outcome):
+        bracket = self.tournament.bracket
+        table = chunk.table.copy()
+        home, away = table[:, bracket.source[i, 0]], table[:, bracket.source[i, 1]]
+        winner = team if outcome > 0 else np.where(home == team, away, home)
+        bracket.replay(table, self.rng, {i: winner})
+        columns = dict(chunk.columns)
+        columns['winners'] = table[:, bracket.knockout_base::2]
+        out = ArrayChunk(self.store, columns)
+        out._table = table
+        return out